@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Admin changelist load times on large expense and report tables.
+
+Fills an in-memory database with --rows expenses, then times the admin
+changelist pages twice: once with Django's default list behaviour (full
+COUNT(*), no select_related, substring search across the user join) and once
+with the tuned ExpenseAdmin/ReportAdmin settings.
+"""
+import argparse
+import random
+from datetime import date, timedelta
+from functools import partial
+
+from common import print_header, setup_django, timed
+
+
+def populate(rows, users, reports_per_user):
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.db import connection, transaction
+    from django.utils import timezone
+    
+    User = get_user_model()
+    now = timezone.now()
+    password = make_password('benchpass123')
+    User.objects.bulk_create(
+        User(username=f'user{i}', email=f'user{i}@example.com', password=password)
+        for i in range(users)
+    )
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    
+    categories = ['food', 'transport', 'entertainment', 'shopping', 'bills', 'health', 'education', 'other']
+    start = date(2015, 1, 1)
+    stamp = connection.ops.adapt_datetimefield_value(now)
+    rng = random.Random(42)
+    with transaction.atomic(), connection.cursor() as cursor:
+        batch = []
+        for _ in range(rows):
+            batch.append((
+                rng.randint(100, 50000), rng.choice(categories),
+                (start + timedelta(days=rng.randint(0, 3650))).isoformat(),
+                'benchmark expense', stamp, stamp, rng.choice(user_ids),
+            ))
+            if len(batch) == 10000:
+                cursor.executemany(
+                    'INSERT INTO expenses_expense (amount_cents, category, date, description, created_at, updated_at, version, user_id) '
+                    'VALUES (%s, %s, %s, %s, %s, %s, 1, %s)', batch
+                )
+                batch = []
+        if batch:
+            cursor.executemany(
+                'INSERT INTO expenses_expense (amount_cents, category, date, description, created_at, updated_at, version, user_id) '
+                'VALUES (%s, %s, %s, %s, %s, %s, 1, %s)', batch
+            )
+        cursor.executemany(
+            'INSERT INTO reports_report (user_id, month, year, total_cents, stats_version, created_at) '
+            'VALUES (%s, %s, %s, %s, 0, %s)',
+            [
+                (user_id, index % 12 + 1, 2015 + index // 12, 10000, stamp)
+                for user_id in user_ids for index in range(reports_per_user)
+            ]
+        )
+        cursor.execute('ANALYZE')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--reports-per-user', type=int, default=120)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    setup_django()
+    
+    from django.contrib import admin
+    from django.contrib.auth import get_user_model
+    from django.core.paginator import Paginator
+    from django.test import Client
+    from expenses.models import Expense
+    from reports.models import Report
+    
+    populate(args.rows, args.users, args.reports_per_user)
+    
+    User = get_user_model()
+    superuser = User.objects.create_superuser('admin', 'admin@example.com', 'adminpass123')
+    client = Client()
+    client.force_login(superuser)
+    
+    pages = [
+        ('expense list', '/admin/expenses/expense/'),
+        ('expense list, category filter', '/admin/expenses/expense/?category__exact=food'),
+        ('expense search by username', '/admin/expenses/expense/?q=user7'),
+        ('expense date hierarchy (year)', '/admin/expenses/expense/?date__year=2020'),
+        ('report list', '/admin/reports/report/'),
+        ('report list, year filter', '/admin/reports/report/?year=2020'),
+    ]
+    
+    def default_admin(model_admin):
+        """Django's defaults, as the admin classes were configured originally"""
+        model_admin.paginator = Paginator
+        model_admin.show_full_result_count = True
+        model_admin.list_select_related = False
+        model_admin.list_prefetch_related = []
+        model_admin.get_queryset = lambda request: model_admin.model._default_manager.all()
+        model_admin.get_search_results = partial(admin.ModelAdmin.get_search_results, model_admin)
+        model_admin.list_filter = [
+            getattr(model_admin.list_filter[i], 'parameter_name', model_admin.list_filter[i])
+            for i in range(len(model_admin.list_filter))
+        ]
+        model_admin.search_fields = ['user__username'] + [
+            field.lstrip('=') for field in model_admin.search_fields if 'user__' not in field
+        ]
+    
+    def load(url):
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+    
+    results = {}
+    for label in ('tuned', 'default'):
+        if label == 'default':
+            for model in (Expense, Report):
+                default_admin(admin.site._registry[model])
+        for name, url in pages:
+            load(url)  # warm up
+            results.setdefault(name, {})[label] = timed(lambda: load(url), args.repeat)
+    
+    print_header(f"Admin changelist benchmark ({args.rows} expenses, "
+                 f"{args.users * args.reports_per_user} reports)")
+    print(f"{'page':<32} {'default':>12} {'tuned':>12}")
+    for name, _ in pages:
+        print(f"{name:<32} {results[name]['default']:>9.1f} ms {results[name]['tuned']:>9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Payload size and encode time of the expense list in each response encoding.
+
+Serializes a user's expense list once and then measures:
+- each available renderer: DRF JSON, columnar JSON, and MessagePack when
+  msgpack is installed
+- each renderer's output compressed the way APICompressionMiddleware would:
+  gzip, and brotli when the brotli package is installed
+"""
+import argparse
+from datetime import date, timedelta
+
+from common import print_header, setup_django, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    
+    setup_django()
+    
+    from django.contrib.auth import get_user_model
+    from expense_tracker.compression import compress, has_brotli
+    from expenses.attachments import prefetch_attachment_ids
+    from expenses.models import Expense
+    from expenses.renderers import ColumnarJSONRenderer, MessagePackRenderer, has_msgpack
+    from expenses.serializers import ExpenseSerializer
+    from rest_framework.renderers import JSONRenderer
+    
+    User = get_user_model()
+    user = User.objects.create_user('bench', 'bench@example.com', 'benchpass123')
+    categories = [choice for choice, _ in Expense.CATEGORY_CHOICES]
+    Expense.objects.bulk_create(
+        Expense(
+            user=user,
+            amount=f'{(i * 37) % 20000 / 100:.2f}',
+            category=categories[i % len(categories)],
+            date=date(2025, 1, 1) + timedelta(days=i % 365),
+            description=f'Expense number {i}'
+        )
+        for i in range(args.rows)
+    )
+    
+    expenses = prefetch_attachment_ids(Expense.objects.filter(user=user).select_related('user'))
+    data = ExpenseSerializer(expenses, many=True).data
+    
+    renderers = [('json', JSONRenderer()), ('columnar', ColumnarJSONRenderer())]
+    if has_msgpack():
+        renderers.append(('msgpack', MessagePackRenderer()))
+    encodings = ['gzip'] + (['br'] if has_brotli() else [])
+    
+    print_header(f'Expense list encodings, {args.rows} rows')
+    print(f"{'renderer':<10} {'encoding':<9} {'bytes':>11} {'vs json':>8} {'encode ms':>10}")
+    baseline = None
+    for name, renderer in renderers:
+        body = renderer.render(data)
+        encode_ms = timed(lambda: renderer.render(data), args.repeat)
+        baseline = baseline or len(body)
+        print(f'{name:<10} {"identity":<9} {len(body):>11,} {len(body) / baseline:>8.0%} {encode_ms:>10.1f}')
+        for encoding in encodings:
+            compressed = compress(body, encoding)
+            compress_ms = timed(lambda: compress(body, encoding), args.repeat)
+            print(
+                f'{name:<10} {encoding:<9} {len(compressed):>11,} {len(compressed) / baseline:>8.0%} '
+                f'{encode_ms + compress_ms:>10.1f}'
+            )
+    
+    if not has_msgpack():
+        print('\nmsgpack is not installed; MessagePack was skipped')
+    if not has_brotli():
+        print('brotli is not installed; brotli compression was skipped')
+
+
+if __name__ == '__main__':
+    main()
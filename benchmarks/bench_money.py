@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Integer-cent amounts vs. the previous DecimalField amounts.
+
+Loads the same expenses into the expense table (integer cents) and into a
+throwaway copy of it that keeps the old DecimalField amount, then compares:
+- the monthly report's grouped SUM per category
+- materializing every amount of a user's expenses
+- serializing the expense list, with DecimalField vs. CentsField amounts
+"""
+import argparse
+from datetime import date, timedelta
+
+from common import print_header, setup_django, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    
+    setup_django()
+    
+    from django.contrib.auth import get_user_model
+    from django.db import connection, models
+    from django.db.models import Count, Sum
+    from rest_framework import serializers
+    from expenses.models import Expense
+    from expenses.serializers import CentsField
+    
+    User = get_user_model()
+    
+    class DecimalExpense(models.Model):
+        user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+        amount = models.DecimalField(max_digits=10, decimal_places=2)
+        category = models.CharField(max_length=20)
+        date = models.DateField()
+        description = models.TextField(blank=True, null=True)
+        created_at = models.DateTimeField(auto_now_add=True)
+        updated_at = models.DateTimeField(auto_now=True)
+        version = models.PositiveIntegerField(default=1)
+        
+        class Meta:
+            app_label = 'benchmarks'
+            indexes = [
+                models.Index(fields=['user', 'updated_at'], name='bench_user_updated_idx'),
+                models.Index(fields=['user', 'date'], name='bench_user_date_idx'),
+                models.Index(fields=['-date', '-created_at'], name='bench_date_created_idx'),
+            ]
+    
+    with connection.schema_editor() as editor:
+        editor.create_model(DecimalExpense)
+    
+    user = User.objects.create_user('bench', 'bench@example.com', 'benchpass123')
+    categories = [choice for choice, _ in Expense.CATEGORY_CHOICES]
+    rows = [
+        ((i * 37) % 20000, categories[i % len(categories)], date(2025, 1, 1) + timedelta(days=i % 28))
+        for i in range(args.rows)
+    ]
+    Expense.objects.bulk_create(
+        (Expense(user=user, amount_cents=cents, category=category, date=day) for cents, category, day in rows),
+        batch_size=5000
+    )
+    DecimalExpense.objects.bulk_create(
+        (DecimalExpense(user=user, amount=f'{cents / 100:.2f}', category=category, date=day)
+         for cents, category, day in rows),
+        batch_size=5000
+    )
+    
+    def group_by_category(model, field):
+        return list(
+            model.objects.filter(user=user, date__gte=date(2025, 1, 1), date__lt=date(2025, 2, 1))
+            .values('category').annotate(total=Sum(field), count=Count('id')).order_by()
+        )
+    
+    class DecimalSerializer(serializers.Serializer):
+        id = serializers.IntegerField()
+        amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+        category = serializers.CharField()
+        date = serializers.DateField()
+    
+    class CentsSerializer(serializers.Serializer):
+        id = serializers.IntegerField()
+        amount = CentsField(source='amount_cents')
+        category = serializers.CharField()
+        date = serializers.DateField()
+    
+    decimal_rows = list(DecimalExpense.objects.filter(user=user))
+    cents_rows = list(Expense.objects.filter(user=user))
+    
+    cases = [
+        ('grouped SUM per category', [
+            lambda: group_by_category(DecimalExpense, 'amount'),
+            lambda: group_by_category(Expense, 'amount_cents'),
+        ]),
+        ('materialize all amounts', [
+            lambda: list(DecimalExpense.objects.filter(user=user).values_list('amount', flat=True)),
+            lambda: list(Expense.objects.filter(user=user).values_list('amount_cents', flat=True)),
+        ]),
+        ('serialize the list', [
+            lambda: DecimalSerializer(decimal_rows, many=True).data,
+            lambda: CentsSerializer(cents_rows, many=True).data,
+        ]),
+    ]
+    
+    print_header(f'Integer cents vs. Decimal amounts, {args.rows} expenses')
+    print(f"{'operation':<26} {'decimal ms':>11} {'cents ms':>9} {'speedup':>8}")
+    for name, (decimal_case, cents_case) in cases:
+        decimal_ms = timed(decimal_case, args.repeat)
+        cents_ms = timed(cents_case, args.repeat)
+        print(f'{name:<26} {decimal_ms:>11.1f} {cents_ms:>9.1f} {decimal_ms / cents_ms:>7.1f}x')
+    
+    # Both stores must agree to the cent
+    decimal_totals = {row['category']: row['total'] for row in group_by_category(DecimalExpense, 'amount')}
+    for row in group_by_category(Expense, 'amount_cents'):
+        assert decimal_totals[row['category']] * 100 == row['total'], row['category']
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Monthly category summary with distribution stats.
+
+Compares, for one user-month:
+- computing median/p90/largest per category from full Expense rows,
+  as a report view would without stored stats
+- recomputing the stats from the compact per-category amount arrays
+- reading the stats stored on the report row
+"""
+import argparse
+import statistics
+from datetime import date, timedelta
+
+from common import print_header, setup_django, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20000, help='Expenses in the measured month')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    
+    setup_django()
+    
+    from django.contrib.auth import get_user_model
+    from expenses.models import Expense
+    from reports.utils import MonthlyReport, invalidate_category_stats
+    
+    User = get_user_model()
+    
+    user = User.objects.create_user('bench', 'bench@example.com', 'benchpass123')
+    categories = [choice for choice, _ in Expense.CATEGORY_CHOICES]
+    Expense.objects.bulk_create(
+        (
+            Expense(
+                user=user,
+                amount_cents=(i * 37) % 20000,
+                category=categories[i % len(categories)],
+                date=date(2025, 1, 1) + timedelta(days=i % 31)
+            )
+            for i in range(args.rows)
+        ),
+        batch_size=5000
+    )
+    MonthlyReport(user, 1, 2025).save()
+    
+    def from_rows():
+        amounts = {}
+        for expense in Expense.objects.filter(user=user, date__gte=date(2025, 1, 1), date__lt=date(2025, 2, 1)):
+            amounts.setdefault(expense.category, []).append(expense.amount_cents)
+        return {
+            category: (statistics.median(values), statistics.quantiles(values, n=10)[-1], max(values))
+            for category, values in amounts.items()
+        }
+    
+    def recompute():
+        invalidate_category_stats(user, {(2025, 1)})
+        MonthlyReport(user, 1, 2025).save()
+    
+    def stored():
+        return MonthlyReport(user, 1, 2025).category_summary
+    
+    print_header(f'Category stats for a month of {args.rows} expenses')
+    print(f"{'operation':<34} {'ms':>8}")
+    for name, case in [
+        ('from full rows, every read', from_rows),
+        ('recompute from amount arrays', recompute),
+        ('stored on the report row', stored),
+    ]:
+        print(f'{name:<34} {timed(case, args.repeat):>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Per-user snapshot dump and load.
+
+Seeds one user with expenses, dumps them with dump_user and loads the
+snapshot back as a new user with load_user, both with the expense indexes
+rebuilt at the end and maintained throughout. For comparison, a sample is
+also created the way cli_test.py seeds data, one ORM save per expense, and
+extrapolated to the full row count.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from common import print_header, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--sample', type=int, default=2000, help='Expenses created one at a time for comparison')
+    args = parser.parse_args()
+    
+    setup_django()
+    
+    from django.contrib.auth import get_user_model
+    from django.db.models import Sum
+    from expenses.models import Expense
+    from expenses.snapshot import dump_user, load_user, open_snapshot
+    from reports.models import DailyTotal
+    from reports.utils import generate_monthly_report
+    
+    User = get_user_model()
+    
+    source = User.objects.create_user('source', 'source@example.com', 'benchpass123')
+    categories = [choice for choice, _ in Expense.CATEGORY_CHOICES]
+    Expense.objects.bulk_create(
+        (
+            Expense(
+                user=source,
+                amount_cents=(i * 37) % 20000,
+                category=categories[i % len(categories)],
+                date=date(2024, 1, 1) + timedelta(days=i % 730),
+                description=f'expense {i}'
+            )
+            for i in range(args.rows)
+        ),
+        batch_size=5000
+    )
+    for month in range(1, 13):
+        generate_monthly_report(source, month, 2024)
+    
+    print_header(f'Per-user snapshot, {args.rows} expenses')
+    path = os.path.join(tempfile.mkdtemp(), 'source.ndjson.gz')
+    start = time.perf_counter()
+    with open_snapshot(path, 'w') as stream:
+        dump_user(source, stream)
+    print(f'{"dump_user":<34} {time.perf_counter() - start:>8.2f} s  ({os.path.getsize(path) / 1e6:.1f} MB gzipped)')
+    
+    for username, defer_indexes in [('deferred', True), ('maintained', False)]:
+        start = time.perf_counter()
+        with open_snapshot(path, 'r') as stream:
+            user, loaded = load_user(
+                stream, username=username, email=f'{username}@example.com', defer_indexes=defer_indexes
+            )
+        label = f'load_user, indexes {"rebuilt at end" if defer_indexes else "maintained"}'
+        print(f'{label:<34} {time.perf_counter() - start:>8.2f} s')
+        assert loaded['e'] == args.rows
+        assert DailyTotal.objects.filter(user=user).aggregate(total=Sum('total_cents'))['total'] == \
+            Expense.objects.filter(user=source).aggregate(total=Sum('amount_cents'))['total']
+        assert user.reports.count() == source.reports.count()
+    
+    row_by_row = User.objects.create_user('row-by-row', 'rows@example.com', 'benchpass123')
+    start = time.perf_counter()
+    for i in range(args.sample):
+        Expense.objects.create(
+            user=row_by_row,
+            amount_cents=(i * 37) % 20000,
+            category=categories[i % len(categories)],
+            date=date(2024, 1, 1) + timedelta(days=i % 730),
+            description=f'expense {i}'
+        )
+    elapsed = time.perf_counter() - start
+    print(f'{"ORM save per expense (projected)":<34} {elapsed * args.rows / args.sample:>8.2f} s')
+
+
+if __name__ == '__main__':
+    main()
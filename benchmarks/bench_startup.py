@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Cold-start time from a fresh interpreter to a ready ORM.
+
+Starts short-lived Python processes with the full web settings and with the
+slim worker settings (expense_tracker.settings_worker). Each process runs
+django.setup() and one ORM query. The benchmark reports:
+- the median wall time of the processes
+- the total import time and the slowest top-level imports, from one extra
+  run under `-X importtime`. That run is kept out of the wall time because
+  the instrumentation itself slows imports down.
+
+The target for the worker profile is at least 20% faster than the full
+settings.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import PROJECT_DIR, print_header
+
+PROFILES = [
+    ('full settings', 'expense_tracker.settings'),
+    ('worker settings', 'expense_tracker.settings_worker'),
+]
+
+READY_ORM = (
+    'import django; django.setup(); '
+    'from expenses.models import Expense; Expense.objects.exists()'
+)
+
+
+def parse_importtime(stderr):
+    """Return the total import time and the top-level imports from -X importtime output, in ms"""
+    total = 0
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        total += int(self_us)
+        if not name.startswith('  '):
+            top_level.append((int(cumulative_us) / 1000, name.strip()))
+    return total / 1000, sorted(top_level, reverse=True)
+
+
+def run_profile(settings_module, env, runs):
+    env = dict(env, DJANGO_SETTINGS_MODULE=settings_module)
+    wall_times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', READY_ORM], cwd=PROJECT_DIR, env=env, check=True)
+        wall_times.append((time.perf_counter() - start) * 1000)
+    
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', READY_ORM],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    import_ms, top_level = parse_importtime(result.stderr)
+    return statistics.median(wall_times), import_ms, top_level
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=15)
+    parser.add_argument('--top', type=int, default=8, help='Slowest top-level imports to list')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, DJANGO_DB_PATH=os.path.join(directory, 'startup.sqlite3'))
+        env.pop('DJANGO_SETTINGS_MODULE', None)
+        subprocess.run(
+            [sys.executable, 'manage.py', 'migrate', '--verbosity', '0'],
+            cwd=PROJECT_DIR, env=env, check=True
+        )
+        
+        print_header(f'Cold start to a ready ORM, median of {args.runs} processes')
+        results = {}
+        for label, settings_module in PROFILES:
+            wall_ms, import_ms, top_level = run_profile(settings_module, env, args.runs)
+            results[label] = wall_ms
+            print(f'\n{label} ({settings_module})')
+            print(f'  wall time:   {wall_ms:8.1f} ms')
+            print(f'  import time: {import_ms:8.1f} ms')
+            for cumulative_ms, name in top_level[:args.top]:
+                print(f'    {cumulative_ms:8.1f} ms  {name}')
+    
+    full, worker = results['full settings'], results['worker settings']
+    print(f'\nworker settings start {(full - worker) / full:.0%} faster ({full - worker:.1f} ms saved per process)')
+
+
+if __name__ == '__main__':
+    main()
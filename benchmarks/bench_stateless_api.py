@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Per-request cost of session authentication vs. stateless bearer tokens.
+
+Compares GET /api/expenses/ made with a session cookie through the full
+middleware stack against the same request made with a signed access token
+through the slim stateless stack.
+"""
+import argparse
+import io
+import sys
+from datetime import date
+
+from common import print_header, setup_django, timed
+
+
+def make_environ(path, **headers):
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'HTTP_HOST': 'testserver',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+    }
+    environ.update(headers)
+    return environ
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--expenses', type=int, default=20)
+    args = parser.parse_args()
+    
+    setup_django()
+    
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+    from expense_tracker.wsgi import application
+    from expenses.models import Expense
+    from users.tokens import issue_tokens
+    
+    User = get_user_model()
+    user = User.objects.create_user('bench', 'bench@example.com', 'benchpass123')
+    Expense.objects.bulk_create(
+        Expense(user=user, amount='12.50', category='food', date=date(2025, 8, 1))
+        for _ in range(args.expenses)
+    )
+    
+    client = Client()
+    client.force_login(user)
+    session_environ = make_environ(
+        '/api/expenses/',
+        HTTP_COOKIE=f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+    )
+    token_environ = make_environ(
+        '/api/expenses/',
+        HTTP_AUTHORIZATION=f"Bearer {issue_tokens(user)['access']}"
+    )
+    
+    def request(environ):
+        statuses = []
+        environ = dict(environ, **{'wsgi.input': io.BytesIO()})
+        body = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+        b''.join(body)
+        assert statuses[0].startswith('200'), statuses[0]
+    
+    print_header(f"Stateless API benchmark ({args.requests} requests, {args.expenses} expenses)")
+    for name, environ in [('session cookie, full stack', session_environ),
+                          ('bearer token, slim stack', token_environ)]:
+        request(environ)  # warm up
+        queries = []
+        with connection.execute_wrapper(lambda execute, sql, *rest: queries.append(sql) or execute(sql, *rest)):
+            request(environ)
+        elapsed = timed(lambda: request(environ), args.requests)
+        print(f"{name:<30} {elapsed:8.3f} ms/request  {len(queries)} queries/request")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Shared setup for the benchmark scripts.
+
+Each benchmark runs against a throwaway in-memory test database, so
+db.sqlite3 is never touched.
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(settings_module='expense_tracker.settings'):
+    """Configure Django and create a fresh test database"""
+    if str(PROJECT_DIR) not in sys.path:
+        sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    
+    import django
+    django.setup()
+    
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment(debug=False)
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def timed(func, repeat):
+    """Run func `repeat` times and return the mean wall time in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def print_header(title):
+    print("=" * 60)
+    print(title)
+    print("=" * 60)
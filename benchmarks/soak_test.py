@@ -0,0 +1,530 @@
+#!/usr/bin/env python
+"""
+Soak test: concurrent API clients against a live development server.
+
+Migrates a temporary SQLite database and serves the project on it from a
+subprocess, with Django's threaded development server. Concurrent clients then
+drive the API for a fixed duration. The clients share a pool of keep-alive
+HTTP/1.1 connections and run either on threads (http.client) or on asyncio
+streams. Each client registers its own user, refreshes its access token
+before it expires, and picks requests from a weighted mix:
+- register: register another user and switch to it
+- create: POST /api/expenses/
+- list: GET /api/expenses/
+- report: GET /api/reports/detail/ for a recent month
+
+At the end it reports throughput, error rate, SQLite "database is locked"
+errors and latency per request type. It also samples the server's resident
+memory (VmRSS, Linux only) at regular intervals, to show growth over time.
+"""
+import argparse
+import asyncio
+import gzip
+import http.client
+import json
+import os
+import queue
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from itertools import count
+
+from common import PROJECT_DIR, print_header
+
+DEFAULT_MIX = 'register=1,create=5,list=3,report=2'
+CATEGORIES = ['food', 'transport', 'entertainment', 'shopping', 'bills', 'health', 'education', 'other']
+LOCKED_MARKER = b'database is locked'
+
+_user_ids = count()
+
+
+# Workload. Each operation is a generator that yields (method, path, body) requests
+# and receives (status, body) responses, so threaded and asyncio clients share it.
+
+def op_register(client):
+    username = f'soak{os.getpid()}_{next(_user_ids)}'
+    password = 'soakpass123'
+    status, _ = yield 'POST', '/api/users/register/', {
+        'username': username,
+        'email': f'{username}@example.com',
+        'password': password
+    }
+    if status != 201:
+        return
+    status, body = yield 'POST', '/api/users/token/', {'username': username, 'password': password}
+    if status == 200:
+        client.set_tokens(json.loads(body))
+
+
+def op_refresh(client):
+    status, body = yield 'POST', '/api/users/token/refresh/', {'refresh': client.refresh}
+    if status == 200:
+        client.set_tokens(json.loads(body))
+    else:
+        # Start over with a new user rather than sending requests that would all get 401
+        client.token = None
+
+
+def op_create(client):
+    yield 'POST', '/api/expenses/', {
+        'amount': f'{random.randint(100, 20000) / 100:.2f}',
+        'category': random.choice(CATEGORIES),
+        'date': (date.today() - timedelta(days=random.randint(0, 90))).isoformat(),
+        'description': 'Soak test expense'
+    }
+
+
+def op_list(client):
+    yield 'GET', '/api/expenses/', None
+
+
+def op_report(client):
+    day = date.today() - timedelta(days=random.randint(0, 90))
+    yield 'GET', f'/api/reports/detail/?month={day.month}&year={day.year}', None
+
+
+# Refresh access tokens this long before they expire
+TOKEN_REFRESH_MARGIN = 60
+
+OPERATIONS = {
+    'register': op_register,
+    'create': op_create,
+    'list': op_list,
+    'report': op_report,
+}
+
+
+def parse_mix(value):
+    """Parse 'name=weight,...' into a list of (name, weight)"""
+    mix = []
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f'Unknown operation {name!r}; choose from {", ".join(OPERATIONS)}')
+        mix.append((name, int(weight or 1)))
+    return mix
+
+
+class Stats:
+    """Request counts and latencies of one client"""
+    
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.locked = 0
+        self.statuses = Counter()
+        self.latencies = defaultdict(list)
+    
+    def record(self, name, status, body, elapsed):
+        self.requests += 1
+        self.statuses[status] += 1
+        self.latencies[name].append(elapsed)
+        if status is None or status >= 400:
+            self.errors += 1
+            if body and LOCKED_MARKER in body:
+                self.locked += 1
+
+
+class SoakClient:
+    """One simulated user: a bearer token and its own statistics"""
+    
+    def __init__(self, mix):
+        self.names = [name for name, _ in mix]
+        self.weights = [weight for _, weight in mix]
+        self.token = None
+        self.refresh = None
+        self.token_expires_at = 0
+        self.stats = Stats()
+    
+    def set_tokens(self, tokens):
+        self.token = tokens['access']
+        self.refresh = tokens['refresh']
+        self.token_expires_at = time.monotonic() + tokens['expires_in'] - TOKEN_REFRESH_MARGIN
+    
+    def next_operation(self):
+        if self.token is None:
+            return 'register', op_register(self)
+        if time.monotonic() >= self.token_expires_at:
+            return 'refresh', op_refresh(self)
+        name = random.choices(self.names, self.weights)[0]
+        return name, OPERATIONS[name](self)
+    
+    def headers(self, body):
+        headers = {'Accept': 'application/json', 'Accept-Encoding': 'gzip'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        return headers
+
+
+def decode_body(body, headers):
+    if headers.get('content-encoding') == 'gzip':
+        return gzip.decompress(body)
+    return body
+
+
+# Threaded clients
+
+class ConnectionPool:
+    """A fixed-size pool of keep-alive http.client connections shared by threads"""
+    
+    def __init__(self, host, port, size):
+        self._connections = queue.LifoQueue()
+        for _ in range(size):
+            self._connections.put(http.client.HTTPConnection(host, port, timeout=30))
+    
+    def request(self, method, path, body, headers):
+        connection = self._connections.get()
+        try:
+            # Retry once on a fresh socket when the server closed an idle connection
+            for attempt in range(2):
+                try:
+                    connection.request(method, path, body=body, headers=headers)
+                    response = connection.getresponse()
+                    data = response.read()
+                    if response.will_close:
+                        connection.close()
+                    return response.status, decode_body(data, {k.lower(): v for k, v in response.getheaders()})
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    connection.close()
+                    if attempt:
+                        raise
+        except Exception:
+            # Leave no half-read response behind for the next user of this connection
+            connection.close()
+            raise
+        finally:
+            self._connections.put(connection)
+    
+    def close(self):
+        while not self._connections.empty():
+            self._connections.get().close()
+
+
+def run_threaded_client(client, pool, deadline):
+    while time.monotonic() < deadline:
+        name, operation = client.next_operation()
+        response = None
+        try:
+            while True:
+                method, path, payload = operation.send(response)
+                body = json.dumps(payload).encode() if payload is not None else None
+                start = time.perf_counter()
+                try:
+                    status, data = pool.request(method, path, body, client.headers(body))
+                except (OSError, http.client.HTTPException):
+                    status, data = None, b''
+                client.stats.record(name, status, data, time.perf_counter() - start)
+                if status is None:
+                    break
+                response = (status, data)
+        except StopIteration:
+            pass
+
+
+def run_threads(clients, host, port, connections, deadline):
+    pool = ConnectionPool(host, port, connections)
+    threads = [
+        threading.Thread(target=run_threaded_client, args=(client, pool, deadline), daemon=True)
+        for client in clients
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.close()
+
+
+# asyncio clients
+
+class AsyncConnectionPool:
+    """A fixed-size pool of keep-alive HTTP/1.1 connections over asyncio streams"""
+    
+    def __init__(self, host, port, size):
+        self.host = host
+        self.port = port
+        self._connections = asyncio.LifoQueue()
+        for _ in range(size):
+            self._connections.put_nowait(None)
+    
+    async def request(self, method, path, body, headers):
+        connection = await self._connections.get()
+        try:
+            for attempt in range(2):
+                if connection is None:
+                    connection = await asyncio.open_connection(self.host, self.port)
+                try:
+                    status, response_headers, data = await self._exchange(connection, method, path, body, headers)
+                    break
+                except (asyncio.IncompleteReadError, ConnectionResetError, BrokenPipeError):
+                    connection[1].close()
+                    connection = None
+                    if attempt:
+                        raise
+            if response_headers.get('connection', '').lower() == 'close':
+                connection[1].close()
+                connection = None
+            return status, decode_body(data, response_headers)
+        except BaseException:
+            if connection is not None:
+                connection[1].close()
+                connection = None
+            raise
+        finally:
+            self._connections.put_nowait(connection)
+    
+    async def _exchange(self, connection, method, path, body, headers):
+        reader, writer = connection
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        lines.append(f'Content-Length: {len(body or b"")}')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b''))
+        await writer.drain()
+        
+        status = int((await reader.readuntil(b'\r\n')).split()[1])
+        response_headers = {}
+        while True:
+            line = await reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+        
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                chunk = await reader.readexactly(size + 2)
+                if not size:
+                    break
+                chunks.append(chunk[:-2])
+            data = b''.join(chunks)
+        elif 'content-length' in response_headers:
+            data = await reader.readexactly(int(response_headers['content-length']))
+        else:
+            data = await reader.read()
+            response_headers['connection'] = 'close'
+        return status, response_headers, data
+    
+    def close(self):
+        while not self._connections.empty():
+            connection = self._connections.get_nowait()
+            if connection is not None:
+                connection[1].close()
+
+
+async def run_async_client(client, pool, deadline):
+    while time.monotonic() < deadline:
+        name, operation = client.next_operation()
+        response = None
+        try:
+            while True:
+                method, path, payload = operation.send(response)
+                body = json.dumps(payload).encode() if payload is not None else None
+                start = time.perf_counter()
+                try:
+                    status, data = await pool.request(method, path, body, client.headers(body))
+                except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                    status, data = None, b''
+                client.stats.record(name, status, data, time.perf_counter() - start)
+                if status is None:
+                    break
+                response = (status, data)
+        except StopIteration:
+            pass
+
+
+async def run_asyncio_clients(clients, host, port, connections, deadline):
+    pool = AsyncConnectionPool(host, port, connections)
+    await asyncio.gather(*(run_async_client(client, pool, deadline) for client in clients))
+    pool.close()
+
+
+def run_asyncio(clients, host, port, connections, deadline):
+    asyncio.run(run_asyncio_clients(clients, host, port, connections, deadline))
+
+
+# Server process
+
+def serve(address):
+    """Serve the project's WSGI application like runserver does, but with TCP_NODELAY.
+    
+    runserver's request handler leaves Nagle's algorithm on. A keep-alive
+    response is written in several small sends, so its last segment waits
+    for the client's delayed ACK, adding ~40 ms to every request on Linux.
+    """
+    sys.path.insert(0, str(PROJECT_DIR))
+    import django
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+    
+    class NoDelayRequestHandler(WSGIRequestHandler):
+        disable_nagle_algorithm = True
+    
+    django.setup()
+    host, _, port = address.rpartition(':')
+    server = ThreadedWSGIServer((host, int(port)), NoDelayRequestHandler)
+    server.set_app(get_internal_wsgi_application())
+    server.serve_forever()
+
+
+def free_port(host):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(process, host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'Server exited with status {process.returncode}')
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('Server did not start in time')
+
+
+def read_rss_kb(pid):
+    """Resident set size of a process in KiB, or None where /proc is unavailable"""
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def sample_server(pid, clients, deadline, interval, samples):
+    """Record (elapsed s, RSS KiB, requests so far) every interval until the deadline"""
+    start = time.monotonic()
+    while True:
+        requests = sum(client.stats.requests for client in clients)
+        samples.append((time.monotonic() - start, read_rss_kb(pid), requests))
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(interval, remaining))
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def print_results(clients, samples, duration):
+    totals = Stats()
+    for client in clients:
+        stats = client.stats
+        totals.requests += stats.requests
+        totals.errors += stats.errors
+        totals.locked += stats.locked
+        totals.statuses.update(stats.statuses)
+        for name, latencies in stats.latencies.items():
+            totals.latencies[name].extend(latencies)
+    
+    print(f'\nrequests:     {totals.requests:,} ({totals.requests / duration:,.1f}/s)')
+    print(f'errors:       {totals.errors:,} ({totals.errors / max(totals.requests, 1):.2%})')
+    print(f'locked:       {totals.locked:,} "database is locked" responses')
+    statuses = ', '.join(f'{status or "failed"}: {n:,}' for status, n in sorted(
+        totals.statuses.items(), key=lambda item: item[0] or 0
+    ))
+    print(f'statuses:     {statuses}')
+    
+    print(f"\n{'request':<10} {'count':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, latencies in sorted(totals.latencies.items()):
+        print(
+            f'{name:<10} {len(latencies):>8,} {statistics.median(latencies) * 1000:>8.1f} '
+            f'{percentile(latencies, 0.95) * 1000:>8.1f} {max(latencies) * 1000:>8.1f}'
+        )
+    
+    if samples and samples[0][1] is None:
+        print('\nServer memory is not available on this platform')
+        return
+    print(f"\n{'time s':>7} {'RSS MiB':>8} {'req/s':>8}")
+    previous = (0, None, 0)
+    for elapsed, rss_kb, requests in samples:
+        rate = (requests - previous[2]) / (elapsed - previous[0]) if elapsed > previous[0] else 0
+        print(f'{elapsed:>7.1f} {rss_kb / 1024:>8.1f} {rate:>8.1f}')
+        previous = (elapsed, rss_kb, requests)
+    growth = samples[-1][1] - samples[0][1]
+    print(f'\nserver RSS grew {growth / 1024:+.1f} MiB over the run')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--connections', type=int, default=8, help='Size of the shared keep-alive pool')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds to run for')
+    parser.add_argument('--mode', choices=['threads', 'asyncio'], default='threads')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX, help=f'Weighted request mix (default {DEFAULT_MIX})')
+    parser.add_argument('--sample-interval', type=float, default=5, help='Seconds between memory samples')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--serve', metavar='HOST:PORT', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.serve:
+        serve(args.serve)
+        return
+    
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(
+            os.environ,
+            DJANGO_DB_PATH=os.path.join(directory, 'soak.sqlite3'),
+            DJANGO_MEDIA_ROOT=os.path.join(directory, 'media'),
+            DJANGO_SETTINGS_MODULE='expense_tracker.settings'
+        )
+        env.pop('DJANGO_REPLICA_DB_PATH', None)
+        subprocess.run(
+            [sys.executable, 'manage.py', 'migrate', '--verbosity', '0'],
+            cwd=PROJECT_DIR, env=env, check=True
+        )
+        
+        port = free_port(args.host)
+        server = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--serve', f'{args.host}:{port}'],
+            cwd=PROJECT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_for_server(server, args.host, port)
+            
+            print_header(
+                f'Soak test: {args.clients} {args.mode} clients, {args.connections} connections, '
+                f'{args.duration:g}s'
+            )
+            clients = [SoakClient(args.mix) for _ in range(args.clients)]
+            deadline = time.monotonic() + args.duration
+            samples = []
+            sampler = threading.Thread(
+                target=sample_server,
+                args=(server.pid, clients, deadline, args.sample_interval, samples),
+                daemon=True
+            )
+            sampler.start()
+            
+            start = time.monotonic()
+            runner = run_threads if args.mode == 'threads' else run_asyncio
+            runner(clients, args.host, port, args.connections, deadline)
+            duration = time.monotonic() - start
+            sampler.join()
+        finally:
+            server.terminate()
+            server.wait()
+        
+        print_results(clients, samples, duration)
+
+
+if __name__ == '__main__':
+    main()
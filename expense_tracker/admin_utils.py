@@ -0,0 +1,112 @@
+"""
+Admin helpers for tables with millions of rows.
+
+LargeTableAdmin avoids the queries that make the stock changelist scale with
+table size:
+- an unbounded COUNT(*) for pagination
+- a second COUNT(*) of the unfiltered table
+- a SELECT DISTINCT over a truncated date for the date hierarchy
+- an INNER JOIN to the user table that stops SQLite from walking the ordering index
+"""
+from datetime import date
+
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db.models import Max, Min, QuerySet
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never runs an unbounded COUNT(*).
+    
+    Unfiltered querysets are counted from the primary key range, which is an
+    index lookup. Filtered querysets are counted up to `count_limit` rows only,
+    so pages past that limit are not linked.
+    """
+    count_limit = 10000
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+        if not queryset.query.where:
+            return self.estimate_table_rows(queryset)
+        return queryset.values('pk')[:self.count_limit].count()
+    
+    def estimate_table_rows(self, queryset):
+        pk_range = queryset.values_list('pk', flat=True)
+        first = pk_range.order_by('pk').first()
+        if first is None:
+            return 0
+        return pk_range.order_by('-pk').first() - first + 1
+
+
+def _next_period(day, kind):
+    if kind == 'year':
+        return date(day.year + 1, 1, 1)
+    if kind == 'month':
+        return date(day.year + 1, 1, 1) if day.month == 12 else date(day.year, day.month + 1, 1)
+    return date.fromordinal(day.toordinal() + 1)
+
+
+def _truncate(day, kind):
+    if kind == 'year':
+        return date(day.year, 1, 1)
+    if kind == 'month':
+        return date(day.year, day.month, 1)
+    return day
+
+
+class IndexedDatesQuerySet(QuerySet):
+    """QuerySet whose date aggregates walk an index instead of scanning the table.
+    
+    dates() finds each distinct year/month/day with one MIN(field) >= lower-bound
+    probe, so its cost grows with the number of periods rather than rows, and
+    MIN/MAX pairs are split into separate queries that SQLite answers with a
+    single index seek each. Queries that join other tables use the stock code.
+    """
+    
+    def dates(self, field_name, kind, order='ASC'):
+        if kind not in ('year', 'month', 'day') or self._has_joins():
+            return super().dates(field_name, kind, order)
+        
+        periods = []
+        queryset = self.order_by()
+        lower = None
+        while True:
+            bounded = queryset if lower is None else queryset.filter(**{f'{field_name}__gte': lower})
+            first = bounded.aggregate(first=Min(field_name))['first']
+            if first is None:
+                break
+            periods.append(_truncate(first, kind))
+            lower = _next_period(periods[-1], kind)
+        
+        return periods[::-1] if order == 'DESC' else periods
+    
+    def aggregate(self, *args, **kwargs):
+        if args or len(kwargs) < 2 or self._has_joins() or not all(
+            isinstance(expression, (Min, Max)) for expression in kwargs.values()
+        ):
+            return super().aggregate(*args, **kwargs)
+        
+        result = {}
+        for alias, expression in kwargs.items():
+            result.update(super().aggregate(**{alias: expression}))
+        return result
+    
+    def _has_joins(self):
+        # Aliases with no references left are trimmed from the SQL, so don't count them
+        return sum(1 for count in self.query.alias_refcount.values() if count) > 1
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """ModelAdmin base for changelists over very large tables"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Users are prefetched in get_queryset rather than joined (see module docstring)
+    list_select_related = []
+    list_prefetch_related = ['user']
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        queryset = IndexedDatesQuerySet(model=queryset.model, query=queryset.query, using=queryset._db)
+        return queryset.prefetch_related(*self.list_prefetch_related)
@@ -0,0 +1,90 @@
+"""
+Negotiated response compression for the JSON API.
+
+Responses under STATELESS_API_PREFIX that are at least API_COMPRESSION_MIN_SIZE
+bytes are compressed with brotli when the client accepts it and the `brotli`
+package is installed, and with gzip otherwise. Streaming responses, such as
+receipt downloads, are left alone because they are already compressed file
+formats served with byte ranges.
+"""
+from functools import lru_cache
+from importlib import import_module
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+
+@lru_cache(maxsize=None)
+def has_brotli():
+    return find_spec('brotli') is not None
+
+
+def parse_accept_encoding(header):
+    """Return the content codings a client accepts, ignoring those with q=0"""
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(header):
+    """Pick the best encoding this server supports for an Accept-Encoding header"""
+    accepted = parse_accept_encoding(header)
+    if has_brotli() and ('br' in accepted or '*' in accepted):
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return import_module('brotli').compress(content, quality=settings.API_COMPRESSION_BROTLI_QUALITY)
+    # Random gzip header padding, as in GZipMiddleware, mitigates BREACH-style attacks
+    return compress_string(content, max_random_bytes=100)
+
+
+class APICompressionMiddleware:
+    """Compress large API responses with the best encoding the client accepts"""
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            not request.path.startswith(settings.STATELESS_API_PREFIX)
+            or response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < settings.API_COMPRESSION_MIN_SIZE
+        ):
+            return response
+        
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = encoding
+        
+        # A strong ETag must change with the encoding; keep it usable for If-Match as a weak one
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,69 @@
+"""
+WSGI entry point that gives token-authenticated API calls a slimmer middleware stack.
+
+Requests to /api/ that carry an `Authorization: Bearer` header are handled with
+STATELESS_API_MIDDLEWARE, which leaves out sessions, authentication, messages,
+CSRF, and clickjacking protection. Those middleware only matter for cookie-based
+clients. Everything else goes through the regular MIDDLEWARE stack.
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.handlers.wsgi import WSGIHandler
+from django.utils.module_loading import import_string
+
+
+class StatelessAPIHandler(WSGIHandler):
+    """WSGI handler whose middleware chain is built from the given list instead of settings.MIDDLEWARE"""
+    
+    def __init__(self, middleware):
+        self.middleware = list(middleware)
+        super().__init__()
+    
+    def load_middleware(self, is_async=False):
+        # Same chain building as BaseHandler.load_middleware, for synchronous WSGI only
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+        
+        handler = convert_exception_to_response(self._get_response)
+        for middleware_path in reversed(self.middleware):
+            middleware = import_string(middleware_path)
+            if not getattr(middleware, 'sync_capable', True):
+                raise ImproperlyConfigured(f'Middleware {middleware_path} cannot run synchronously.')
+            try:
+                instance = middleware(handler)
+            except MiddlewareNotUsed:
+                continue
+            if instance is None:
+                raise ImproperlyConfigured(f'Middleware factory {middleware_path} returned None.')
+            
+            if hasattr(instance, 'process_view'):
+                self._view_middleware.insert(0, instance.process_view)
+            if hasattr(instance, 'process_template_response'):
+                self._template_response_middleware.append(instance.process_template_response)
+            if hasattr(instance, 'process_exception'):
+                self._exception_middleware.append(instance.process_exception)
+            handler = convert_exception_to_response(instance)
+        
+        self._middleware_chain = handler
+
+
+def is_stateless_api_request(environ):
+    return (
+        environ.get('PATH_INFO', '').startswith(settings.STATELESS_API_PREFIX)
+        and environ.get('HTTP_AUTHORIZATION', '')[:7].lower() == 'bearer '
+    )
+
+
+class StatelessAPIDispatcher:
+    """Send bearer-token API requests to the slim handler and the rest to the full one"""
+    
+    def __init__(self, application):
+        self.application = application
+        self.stateless_application = StatelessAPIHandler(settings.STATELESS_API_MIDDLEWARE)
+    
+    def __call__(self, environ, start_response):
+        if is_stateless_api_request(environ):
+            return self.stateless_application(environ, start_response)
+        return self.application(environ, start_response)
@@ -0,0 +1,84 @@
+"""
+Database routing for a primary/replica setup.
+
+Writes always go to the primary. Views that opt in through ReplicaReadMixin
+read from the replica, unless the same user wrote something within the last
+REPLICA_STICKINESS_SECONDS. That way users always read their own writes.
+"""
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+_state = threading.local()
+
+
+def get_replica_alias():
+    """Return the configured replica alias, or None when no replica is configured"""
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', None)
+    return alias if alias in settings.DATABASES else None
+
+
+def _pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def is_pinned_to_primary(user):
+    """Check whether a user wrote recently and must keep reading from the primary"""
+    return bool(user and user.is_authenticated and cache.get(_pin_key(user.pk)))
+
+
+def pin_to_primary(user):
+    """Keep a user's reads on the primary for the stickiness window"""
+    cache.set(_pin_key(user.pk), True, settings.REPLICA_STICKINESS_SECONDS)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if getattr(_state, 'use_replica', False) and not getattr(_state, 'wrote', False):
+            return get_replica_alias()
+        return None
+    
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return 'default'
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds a copy of the primary, so objects from either may be related
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Reset the routing state per request and pin users to the primary after a write"""
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        _state.use_replica = False
+        _state.wrote = False
+        try:
+            return self.get_response(request)
+        finally:
+            user = getattr(request, 'user', None)
+            if _state.wrote and user is not None and user.is_authenticated:
+                pin_to_primary(user)
+            _state.use_replica = False
+            _state.wrote = False
+
+
+class ReplicaReadMixin:
+    """Serve a read-only API view from the replica when the user has no recent writes"""
+    
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            request.method in SAFE_METHODS
+            and get_replica_alias()
+            and not is_pinned_to_primary(request.user)
+        ):
+            _state.use_replica = True
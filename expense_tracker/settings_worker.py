@@ -0,0 +1,27 @@
+"""
+Slim settings for processes that only need the ORM: management commands,
+batch jobs and short-lived workers.
+
+Usage: DJANGO_SETTINGS_MODULE=expense_tracker.settings_worker
+
+The admin, sessions, messages, static files, CORS, DRF and django-filter
+apps are left out, together with all middleware and templates, because
+loading them costs start-up time and nothing outside the HTTP stack uses
+them. Everything else, including the databases, is shared with the main
+settings.
+"""
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'users',
+    'expenses',
+    'reports',
+    'households',
+]
+
+MIDDLEWARE = []
+TEMPLATES = []
+ROOT_URLCONF = None
+WSGI_APPLICATION = None
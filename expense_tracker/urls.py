@@ -1,9 +1,10 @@
-from django.contrib import admin
-from django.urls import path, include
-
-urlpatterns = [
-    path('admin/', admin.site.urls),
-    path('api/users/', include('users.urls')),
-    path('api/expenses/', include('expenses.urls')),
-    path('api/reports/', include('reports.urls')),
-]
+from django.contrib import admin
+from django.urls import path, include
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('api/users/', include('users.urls')),
+    path('api/expenses/', include('expenses.urls')),
+    path('api/reports/', include('reports.urls')),
+    path('api/households/', include('households.urls')),
+]
@@ -1,11 +1,15 @@
-"""
-WSGI config for expense_tracker project.
-"""
-
-import os
-
-from django.core.wsgi import get_wsgi_application
-
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'expense_tracker.settings')
-
-application = get_wsgi_application()
+"""
+WSGI config for expense_tracker project.
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'expense_tracker.settings')
+
+application = get_wsgi_application()
+
+from expense_tracker.handlers import StatelessAPIDispatcher  # noqa: E402 (needs configured settings)
+
+application = StatelessAPIDispatcher(application)
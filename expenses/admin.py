@@ -1,10 +1,36 @@
-from django.contrib import admin
-from .models import Expense
-
-
-@admin.register(Expense)
-class ExpenseAdmin(admin.ModelAdmin):
-    list_display = ['user', 'amount', 'category', 'date', 'created_at']
-    list_filter = ['category', 'date', 'created_at']
-    search_fields = ['user__username', 'description']
-    ordering = ['-date', '-created_at']
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from expense_tracker.admin_utils import LargeTableAdmin
+from .models import Expense
+from .utils import delete_expenses
+
+User = get_user_model()
+
+
+@admin.register(Expense)
+class ExpenseAdmin(LargeTableAdmin):
+    list_display = ['user', 'amount', 'category', 'date', 'created_at']
+    list_filter = ['category', 'date', 'created_at']
+    search_fields = ['=user__username', 'description']
+    search_help_text = 'Exact username, or text contained in the description'
+    autocomplete_fields = ['user']
+    date_hierarchy = 'date'
+    ordering = ['-date', '-created_at']
+    
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        
+        # An exact username narrows by the indexed user_id instead of OR-ing a join
+        # with the description scan
+        user_id = User.objects.filter(username=search_term).values_list('pk', flat=True).first()
+        if user_id is not None:
+            return queryset.filter(user_id=user_id), False
+        return queryset.filter(description__icontains=search_term), False
+    
+    def delete_queryset(self, request, queryset):
+        # QuerySet.delete() skips Expense.delete(), so go through the set-based helper
+        # that keeps the totals, tombstones and events of every owner in step
+        for user_id in queryset.order_by().values_list('user_id', flat=True).distinct():
+            delete_expenses(User(pk=user_id), queryset)
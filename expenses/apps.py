@@ -1,6 +1,6 @@
-from django.apps import AppConfig
-
-
-class ExpensesConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'expenses'
+from django.apps import AppConfig
+
+
+class ExpensesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'expenses'
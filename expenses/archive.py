@@ -0,0 +1,83 @@
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from .models import Expense, ArchivedExpense, ArchiveWatermark
+
+ARCHIVE_COLUMNS = [
+    'id', 'user_id', 'amount_cents', 'category', 'date', 'description',
+    'created_at', 'updated_at', 'version',
+]
+
+
+def get_expense_sources(user, date_from=None):
+    """Return the expense querysets that must be read for dates on or after date_from.
+    
+    The archive table is only consulted when the user has archived expenses and
+    the requested range reaches back past the archive watermark.
+    """
+    sources = [Expense.objects.filter(user=user)]
+    archived_before = ArchiveWatermark.objects.filter(user=user).values_list(
+        'archived_before', flat=True
+    ).first()
+    if archived_before is not None and (date_from is None or date_from < archived_before):
+        sources.append(ArchivedExpense.objects.filter(user=user))
+    return sources
+
+
+def get_member_expense_sources(user_ids, date_from=None):
+    """Return the expense querysets holding several users' expenses dated on or after date_from"""
+    sources = [Expense.objects.filter(user_id__in=user_ids)]
+    watermarks = ArchiveWatermark.objects.filter(user_id__in=user_ids)
+    if date_from is not None:
+        watermarks = watermarks.filter(archived_before__gt=date_from)
+    if watermarks.exists():
+        sources.append(ArchivedExpense.objects.filter(user_id__in=user_ids))
+    return sources
+
+
+def raise_watermarks(cutoff):
+    """Record that expenses dated before cutoff may now live in the archive"""
+    user_ids = set(
+        Expense.objects.filter(date__lt=cutoff).order_by().values_list('user_id', flat=True).distinct()
+    )
+    if not user_ids:
+        return
+    
+    ArchiveWatermark.objects.filter(user_id__in=user_ids, archived_before__lt=cutoff).update(
+        archived_before=cutoff
+    )
+    existing = set(ArchiveWatermark.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+    ArchiveWatermark.objects.bulk_create(
+        ArchiveWatermark(user_id=user_id, archived_before=cutoff) for user_id in user_ids - existing
+    )
+
+
+def archive_expenses(cutoff, batch_size=1000):
+    """Move expenses dated before cutoff into the archive table in batches"""
+    # Raise the watermarks first so reads keep finding rows while they move
+    with transaction.atomic():
+        raise_watermarks(cutoff)
+    
+    columns = ', '.join(ARCHIVE_COLUMNS)
+    insert_sql = (
+        f'INSERT INTO {ArchivedExpense._meta.db_table} ({columns}, archived_at) '
+        f'SELECT {columns}, %s FROM {Expense._meta.db_table} WHERE date < %s AND id <= %s'
+    )
+    
+    moved = 0
+    while True:
+        with transaction.atomic():
+            batch = Expense.objects.filter(date__lt=cutoff).order_by('pk').values_list('pk', flat=True)
+            last_id = batch[:batch_size].aggregate(last_id=Max('pk'))['last_id']
+            if last_id is None:
+                break
+            
+            with connection.cursor() as cursor:
+                cursor.execute(insert_sql, [
+                    connection.ops.adapt_datetimefield_value(timezone.now()),
+                    connection.ops.adapt_datefield_value(cutoff),
+                    last_id,
+                ])
+            deleted, _ = Expense.objects.filter(date__lt=cutoff, pk__lte=last_id).delete()
+            moved += deleted
+    return moved
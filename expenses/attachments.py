@@ -0,0 +1,362 @@
+"""
+Receipt storage for expense attachments.
+
+Uploads are streamed to disk in chunks while their SHA-256 digest is computed,
+then moved to a content-addressed path, so the same file uploaded twice is
+stored once. Thumbnails are rendered in a background thread on first request
+and cached next to the blobs. Pillow is optional; without it no thumbnails
+are generated. Pillow and the thread pool are imported on first use, so
+processes that never render a thumbnail do not pay for them at start-up.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from functools import lru_cache
+from importlib.util import find_spec
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.db import IntegrityError, transaction
+from django.db.models import ProtectedError
+from django.http import FileResponse, Http404, HttpResponse
+from .models import Attachment, ReceiptBlob
+
+# Leading bytes of the accepted receipt formats; the client's Content-Type is not trusted
+FILE_SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'%PDF-', 'application/pdf'),
+]
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+_thumbnail_executor = None
+_thumbnail_lock = threading.Lock()
+_thumbnails_pending = set()
+
+
+def get_receipt_root():
+    return Path(settings.MEDIA_ROOT) / 'receipts'
+
+
+def get_blob_path(sha256):
+    """Return the content-addressed path of a stored blob"""
+    return get_receipt_root() / sha256[:2] / sha256[2:4] / sha256
+
+
+def get_thumbnail_path(sha256):
+    return get_receipt_root() / 'thumbnails' / sha256[:2] / f'{sha256}.jpg'
+
+
+def get_thumbnail_failure_path(sha256):
+    """Marker left next to the thumbnail cache when a blob cannot be rendered"""
+    return get_receipt_root() / 'thumbnails' / sha256[:2] / f'{sha256}.failed'
+
+
+def sniff_content_type(header):
+    """Detect a receipt's content type from its first bytes, or None if unsupported"""
+    for signature, content_type in FILE_SIGNATURES:
+        if header.startswith(signature):
+            return content_type
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+class HashedUploadedFile(UploadedFile):
+    """An upload already written to a temporary file in the receipt directory"""
+    
+    def __init__(self, path, name, content_type, size, sha256):
+        super().__init__(open(path, 'rb'), name, content_type, size)
+        self.path = path
+        self.sha256 = sha256
+    
+    def temporary_file_path(self):
+        return self.path
+
+
+class ReceiptUploadHandler(FileUploadHandler):
+    """Stream an uploaded receipt to disk in chunks, hashing it on the way.
+    
+    Nothing is buffered in memory beyond one chunk. An upload larger than
+    RECEIPT_MAX_UPLOAD_SIZE is discarded and the request body is not read
+    any further.
+    """
+    chunk_size = 64 * 2 ** 10
+    
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.too_large = False
+        self.temp_path = None
+    
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        directory = get_receipt_root() / 'tmp'
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(dir=directory)
+        self.file = os.fdopen(fd, 'wb')
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.header = b''
+    
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > settings.RECEIPT_MAX_UPLOAD_SIZE:
+            self.too_large = True
+            self.discard()
+            raise StopUpload(connection_reset=True)
+        
+        if len(self.header) < 16:
+            self.header += raw_data[:16]
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+    
+    def file_complete(self, file_size):
+        self.file.close()
+        return HashedUploadedFile(
+            self.temp_path,
+            self.file_name,
+            sniff_content_type(self.header),
+            self.size,
+            self.digest.hexdigest()
+        )
+    
+    def upload_interrupted(self):
+        self.discard()
+    
+    def discard(self):
+        """Remove the partially written temporary file"""
+        if self.temp_path is not None:
+            self.file.close()
+            try:
+                os.remove(self.temp_path)
+            except FileNotFoundError:
+                pass
+            self.temp_path = None
+
+
+def attach_receipt(expense, user, upload, attempts=3):
+    """Store an upload under its content-addressed path and attach it to an expense.
+    
+    The blob is looked up (or created) and the attachment inserted in one
+    transaction, with the blob row locked, so prune_receipt_blobs cannot delete
+    the blob in between. If a prune or a concurrent upload of the same content
+    wins the race, the transaction fails on a constraint and is retried.
+    """
+    upload.close()
+    for attempt in range(attempts):
+        try:
+            with transaction.atomic():
+                blob = ReceiptBlob.objects.select_for_update().filter(sha256=upload.sha256).first()
+                if blob is None:
+                    blob = ReceiptBlob.objects.create(
+                        sha256=upload.sha256,
+                        size=upload.size,
+                        content_type=upload.content_type
+                    )
+                attachment = Attachment.objects.create(
+                    expense=expense,
+                    user=user,
+                    blob=blob,
+                    filename=upload.name[:255]
+                )
+            break
+        except IntegrityError:
+            if attempt == attempts - 1:
+                raise
+    
+    # Same content, same path: replacing an existing copy is harmless and atomic
+    path = get_blob_path(upload.sha256)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(upload.temporary_file_path(), path)
+    return attachment
+
+
+def delete_expense_attachments(expense_ids):
+    """Delete the attachment rows of the given expenses; blobs are left for prune_receipts"""
+    return Attachment.objects.filter(expense_id__in=expense_ids).delete()[0]
+
+
+def prefetch_attachment_ids(expenses):
+    """Set attachment_ids on live or archived expense instances with one query"""
+    expenses = list(expenses)
+    attachment_ids = {}
+    rows = Attachment.objects.filter(
+        expense_id__in=[expense.pk for expense in expenses]
+    ).order_by('pk').values_list('expense_id', 'pk')
+    for expense_id, pk in rows:
+        attachment_ids.setdefault(expense_id, []).append(pk)
+    for expense in expenses:
+        expense.attachment_ids = attachment_ids.get(expense.pk, [])
+    return expenses
+
+
+def prune_receipt_blobs():
+    """Delete blobs, their files and thumbnails that no attachment references any more"""
+    orphans = ReceiptBlob.objects.filter(attachments__isnull=True).values_list('pk', flat=True)
+    pruned = 0
+    for pk in list(orphans):
+        try:
+            with transaction.atomic():
+                blob = ReceiptBlob.objects.select_for_update(of=('self',)).filter(
+                    pk=pk,
+                    attachments__isnull=True
+                ).first()
+                if blob is None:
+                    continue
+                blob.delete()
+                # Remove the files before committing, while no upload can attach to the blob
+                for path in (
+                    get_blob_path(blob.sha256),
+                    get_thumbnail_path(blob.sha256),
+                    get_thumbnail_failure_path(blob.sha256),
+                ):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+        except ProtectedError:
+            # Attached to by an upload that committed first
+            continue
+        pruned += 1
+    return pruned
+
+
+class _RangeReader:
+    """Read at most `length` bytes from a file, for streaming a single byte range"""
+    
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+    
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+    
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Parse a single-range Range header into inclusive (start, end) offsets.
+    
+    Returns None when the header is absent or malformed, in which case the whole
+    file is sent, and raises ValueError when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        raise ValueError('Unsatisfiable range')
+    return start, end
+
+
+def receipt_response(request, attachment):
+    """Serve an attachment's file, honouring a single byte Range request"""
+    blob = attachment.blob
+    path = get_blob_path(blob.sha256)
+    try:
+        byte_range = parse_range(request.headers.get('Range'), blob.size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{blob.size}'
+        return response
+    
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        raise Http404('The receipt file is missing.')
+    if byte_range is None:
+        response = FileResponse(file, content_type=blob.content_type, filename=attachment.filename)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(
+            _RangeReader(file, end - start + 1),
+            status=206,
+            content_type=blob.content_type,
+            filename=attachment.filename
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{blob.size}'
+    
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = f'"{blob.sha256}"'
+    response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
+
+
+@lru_cache(maxsize=None)
+def has_pillow():
+    return find_spec('PIL') is not None
+
+
+def can_thumbnail(blob):
+    return has_pillow() and blob.content_type.startswith('image/')
+
+
+def render_thumbnail(sha256):
+    """Render a blob's thumbnail to the on-disk cache, leaving a failure marker if it cannot be read"""
+    try:
+        from PIL import Image
+        
+        path = get_thumbnail_path(sha256)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as output, Image.open(get_blob_path(sha256)) as image:
+                image.thumbnail(settings.RECEIPT_THUMBNAIL_SIZE)
+                image.convert('RGB').save(output, 'JPEG', quality=80)
+        except Exception:
+            # Pillow raises many exception types for corrupt, truncated or oversized images
+            os.remove(temp_path)
+            get_thumbnail_failure_path(sha256).touch()
+            return
+        os.replace(temp_path, path)
+    finally:
+        with _thumbnail_lock:
+            _thumbnails_pending.discard(sha256)
+
+
+def thumbnail_failed(blob):
+    """Whether rendering this blob's thumbnail already failed"""
+    return get_thumbnail_failure_path(blob.sha256).exists()
+
+
+def request_thumbnail(blob):
+    """Return the cached thumbnail path, or queue it for rendering and return None"""
+    path = get_thumbnail_path(blob.sha256)
+    if path.exists():
+        return path
+    
+    global _thumbnail_executor
+    with _thumbnail_lock:
+        if blob.sha256 not in _thumbnails_pending:
+            if _thumbnail_executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                _thumbnail_executor = ThreadPoolExecutor(
+                    max_workers=settings.RECEIPT_THUMBNAIL_WORKERS,
+                    thread_name_prefix='receipt-thumbnail'
+                )
+            _thumbnails_pending.add(blob.sha256)
+            _thumbnail_executor.submit(render_thumbnail, blob.sha256)
+    return None
@@ -0,0 +1,257 @@
+"""
+Transactional outbox of expense changes.
+
+Expense.save() and delete(), and the set-based write helpers in
+expenses.utils, add an ExpenseEvent row in the same transaction as the write,
+so an event exists exactly when its change was committed. Consumers read the
+events in id order, either through the long-poll feed
+(GET /api/expenses/events/) or as webhooks. For webhooks, the
+dispatch_events command delivers each endpoint's pending events in signed
+batches, backing off exponentially while an endpoint keeps failing.
+
+Webhook URLs are user input, so delivery must not become a way to reach the
+server's own network. An endpoint URL has to be http(s) and resolve to public
+addresses only, checked when it is saved and again on the connected socket at
+delivery time, which also catches DNS answers that change in between.
+Redirects and proxies are not followed.
+"""
+import hashlib
+import hmac
+import http.client
+import ipaddress
+import json
+import secrets
+import socket
+import time
+import urllib.parse
+import urllib.request
+from datetime import timedelta
+from http.client import HTTPException
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import Max, Q
+from django.utils import timezone
+from .models import ExpenseEvent, WebhookEndpoint
+from .money import format_cents
+
+SIGNATURE_HEADER = 'X-Expense-Signature'
+
+
+def expense_event_payload(expense):
+    """Snapshot of an expense as sent in created and updated events"""
+    return {
+        'id': expense.pk,
+        'amount': format_cents(expense.amount_cents),
+        'category': expense.category,
+        'date': expense.date.isoformat(),
+        'description': expense.description,
+        'version': expense.version,
+    }
+
+
+def record_expense_events(action, expenses, batch_size=1000):
+    """Add one event per expense; call inside the transaction that wrote them"""
+    ExpenseEvent.objects.bulk_create(
+        (
+            ExpenseEvent(
+                user_id=expense.user_id,
+                expense_id=expense.pk,
+                action=action,
+                payload=expense_event_payload(expense)
+            )
+            for expense in expenses
+        ),
+        batch_size=batch_size
+    )
+
+
+def record_deleted_events(queryset):
+    """Add a deleted event for every expense in a queryset with one INSERT ... SELECT"""
+    select_sql, params = queryset.values('user_id', 'pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {ExpenseEvent._meta.db_table} (user_id, expense_id, action, created_at) '
+            f'SELECT expenses.user_id, expenses.id, %s, %s FROM ({select_sql}) AS expenses',
+            ['deleted', connection.ops.adapt_datetimefield_value(timezone.now()), *params]
+        )
+
+
+def serialize_event(event):
+    return {
+        'id': event.pk,
+        'action': event.action,
+        'expense_id': event.expense_id,
+        'expense': event.payload,
+        'created_at': event.created_at,
+    }
+
+
+def get_events(user, after=0, limit=100):
+    """Return up to limit of a user's events with an id above after, oldest first"""
+    return list(ExpenseEvent.objects.filter(user=user, id__gt=after).order_by('id')[:limit])
+
+
+def wait_for_events(user, after=0, limit=100, wait=0):
+    """Long-poll for events, checking every EXPENSE_EVENT_POLL_INTERVAL seconds for up to wait seconds"""
+    deadline = time.monotonic() + wait
+    while True:
+        events = get_events(user, after, limit)
+        if events or time.monotonic() >= deadline:
+            return events
+        time.sleep(min(settings.EXPENSE_EVENT_POLL_INTERVAL, max(deadline - time.monotonic(), 0)))
+
+
+def latest_event_id(user):
+    return ExpenseEvent.objects.filter(user=user).aggregate(latest=Max('id'))['latest'] or 0
+
+
+def generate_webhook_secret():
+    return secrets.token_hex(32)
+
+
+def sign_payload(secret, body, timestamp):
+    """Build the signature header value: t=<unix time>,v1=<hex HMAC-SHA256 of "t.body">"""
+    message = f'{timestamp}.'.encode() + body
+    digest = hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+    return f't={timestamp},v1={digest}'
+
+
+def get_backoff(failure_count):
+    """Seconds to wait before retrying an endpoint after consecutive failures"""
+    return min(settings.WEBHOOK_BACKOFF_BASE * 2 ** (failure_count - 1), settings.WEBHOOK_BACKOFF_MAX)
+
+
+class UnsafeWebhookURL(ValueError):
+    """A webhook URL that is not http(s) or points at a non-public address"""
+
+
+def check_public_address(host):
+    """Raise UnsafeWebhookURL for loopback, private, link-local, reserved and multicast IP addresses"""
+    if settings.WEBHOOK_ALLOW_PRIVATE_ADDRESSES:
+        return
+    address = ipaddress.ip_address(host.split('%', 1)[0])
+    if not address.is_global or address.is_multicast:
+        raise UnsafeWebhookURL(f'{address} is not a public address.')
+
+
+def check_webhook_url(url):
+    """Raise UnsafeWebhookURL unless url is http(s) and every address its host resolves to is public"""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise UnsafeWebhookURL('Webhook URLs must be http or https.')
+    try:
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        addresses = socket.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+    except (OSError, UnicodeError, ValueError):
+        raise UnsafeWebhookURL(f'Cannot resolve {parts.hostname}.')
+    for *_, sockaddr in addresses:
+        check_public_address(sockaddr[0])
+
+
+class PublicHTTPConnection(http.client.HTTPConnection):
+    def connect(self):
+        super().connect()
+        check_public_address(self.sock.getpeername()[0])
+
+
+class PublicHTTPSConnection(http.client.HTTPSConnection):
+    def connect(self):
+        super().connect()
+        check_public_address(self.sock.getpeername()[0])
+
+
+class PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(PublicHTTPConnection, req)
+
+
+class PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(PublicHTTPSConnection, req, context=self._context)
+
+
+class NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        # A redirect is reported as a failed delivery (HTTPError) instead of being followed
+        return None
+
+
+webhook_opener = urllib.request.build_opener(
+    urllib.request.ProxyHandler({}),
+    PublicHTTPHandler,
+    PublicHTTPSHandler,
+    NoRedirectHandler,
+)
+
+
+def deliver_batch(endpoint, events):
+    """POST a batch of events to an endpoint; raises on network errors, non-2xx responses and unsafe URLs"""
+    check_webhook_url(endpoint.url)
+    body = json.dumps(
+        {'events': [serialize_event(event) for event in events]},
+        cls=DjangoJSONEncoder
+    ).encode()
+    request = urllib.request.Request(endpoint.url, data=body, method='POST', headers={
+        'Content-Type': 'application/json',
+        'User-Agent': 'expense-tracker-webhooks',
+        SIGNATURE_HEADER: sign_payload(endpoint.secret, body, int(time.time())),
+    })
+    with webhook_opener.open(request, timeout=settings.WEBHOOK_TIMEOUT) as response:
+        response.read()
+
+
+def dispatch_endpoint(endpoint, batch_size):
+    """Deliver one batch of an endpoint's pending events and move its cursor or back off.
+    
+    Returns the number of events delivered.
+    """
+    events = list(
+        ExpenseEvent.objects.filter(user_id=endpoint.user_id, id__gt=endpoint.last_event_id)
+        .order_by('id')[:batch_size]
+    )
+    if not events:
+        return 0
+    
+    try:
+        deliver_batch(endpoint, events)
+    except (OSError, HTTPException, UnsafeWebhookURL) as exc:
+        failure_count = endpoint.failure_count + 1
+        WebhookEndpoint.objects.filter(pk=endpoint.pk).update(
+            failure_count=failure_count,
+            next_attempt_at=timezone.now() + timedelta(seconds=get_backoff(failure_count)),
+            last_error=str(exc)[:1000],
+            is_active=failure_count < settings.WEBHOOK_MAX_FAILURES
+        )
+        return 0
+    
+    WebhookEndpoint.objects.filter(pk=endpoint.pk).update(
+        last_event_id=events[-1].pk,
+        failure_count=0,
+        next_attempt_at=None,
+        last_error=''
+    )
+    return len(events)
+
+
+def dispatch_events(batch_size=None):
+    """Deliver pending events to every active endpoint that is due, until all are drained or backing off"""
+    batch_size = batch_size or settings.WEBHOOK_BATCH_SIZE
+    delivered = 0
+    while True:
+        due = WebhookEndpoint.objects.filter(
+            Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=timezone.now()),
+            is_active=True
+        )
+        sent = sum(dispatch_endpoint(endpoint, batch_size) for endpoint in due)
+        if not sent:
+            return delivered
+        delivered += sent
+
+
+def prune_expense_events(now=None):
+    """Delete events older than EXPENSE_EVENT_RETENTION_DAYS"""
+    cutoff = (now or timezone.now()) - timedelta(days=settings.EXPENSE_EVENT_RETENTION_DAYS)
+    deleted, _ = ExpenseEvent.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
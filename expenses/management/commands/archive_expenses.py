@@ -0,0 +1,32 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from expenses.archive import archive_expenses
+
+
+class Command(BaseCommand):
+    help = 'Move expenses older than a number of days into the archive table'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            required=True,
+            help='Archive expenses dated more than this many days ago'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of expenses moved per transaction'
+        )
+    
+    def handle(self, *args, **options):
+        if options['older_than'] < 0:
+            raise CommandError('--older-than must not be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        
+        cutoff = timezone.now().date() - timedelta(days=options['older_than'])
+        moved = archive_expenses(cutoff, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} expenses dated before {cutoff}'))
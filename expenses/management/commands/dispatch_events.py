@@ -0,0 +1,43 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from expenses.events import dispatch_events, prune_expense_events
+
+
+class Command(BaseCommand):
+    help = 'Deliver pending expense events to registered webhook endpoints'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Events per webhook request (defaults to WEBHOOK_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and deliver new events as they arrive'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep between passes with --loop'
+        )
+    
+    def handle(self, *args, **options):
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        if options['interval'] <= 0:
+            raise CommandError('--interval must be positive')
+        
+        while True:
+            pruned = prune_expense_events()
+            delivered = dispatch_events(options['batch_size'])
+            if delivered or pruned or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'Delivered {delivered} events, pruned {pruned} old events'))
+            if not options['loop']:
+                return
+            close_old_connections()
+            time.sleep(options['interval'])
@@ -0,0 +1,34 @@
+import sys
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from expenses.snapshot import dump_user, open_snapshot
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Write a user's expenses, category rules and reports to an NDJSON snapshot"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='User to export')
+        parser.add_argument(
+            'path',
+            help='Snapshot file to write, gzipped when it ends in .gz; - writes to stdout'
+        )
+    
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']} does not exist")
+        
+        if options['path'] == '-':
+            dump_user(user, sys.stdout)
+            sys.stdout.flush()
+            return
+        with open_snapshot(options['path'], 'w') as stream:
+            counts = dump_user(user, stream)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {counts['e']} expenses, {counts['c']} rules and {counts['r']} reports "
+            f"for {user.username} to {options['path']}"
+        ))
@@ -0,0 +1,62 @@
+import io
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from expenses.snapshot import load_user, open_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Create a user with their expenses, category rules and reports from a dump_user snapshot'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Snapshot file to read, plain or gzipped; - reads an uncompressed snapshot from stdin'
+        )
+        parser.add_argument(
+            '--username',
+            help='Create the user under this name instead of the one in the snapshot'
+        )
+        parser.add_argument(
+            '--email',
+            help='Create the user with this email instead of the one in the snapshot'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of expenses per bulk insert'
+        )
+        parser.add_argument(
+            '--defer-indexes',
+            action='store_true',
+            help='Drop the expense indexes during the load and rebuild them at the end; '
+                 'faster for large loads, but locks the expense table'
+        )
+    
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        
+        if options['path'] == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+        else:
+            try:
+                stream = open_snapshot(options['path'], 'r')
+            except OSError as exc:
+                raise CommandError(f"Cannot read {options['path']}: {exc}")
+        
+        with stream:
+            try:
+                user, loaded = load_user(
+                    stream,
+                    username=options['username'],
+                    email=options['email'],
+                    batch_size=options['batch_size'],
+                    defer_indexes=options['defer_indexes']
+                )
+            except ValueError as exc:
+                raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {loaded['e']} expenses, {loaded['c']} rules and {loaded['r']} reports "
+            f"into user {user.username}"
+        ))
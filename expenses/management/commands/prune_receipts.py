@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from expenses.attachments import prune_receipt_blobs
+
+
+class Command(BaseCommand):
+    help = 'Delete stored receipt files that no attachment references any more'
+    
+    def handle(self, *args, **options):
+        pruned = prune_receipt_blobs()
+        self.stdout.write(self.style.SUCCESS(f'Pruned {pruned} unreferenced receipt files'))
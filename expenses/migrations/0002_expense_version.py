@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
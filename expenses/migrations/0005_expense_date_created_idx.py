@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0004_archivedexpense'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['-date', '-created_at'], name='expense_date_created_idx'),
+        ),
+    ]
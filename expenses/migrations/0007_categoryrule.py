@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expenses', '0006_receiptblob_attachment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('food', 'Food'), ('transport', 'Transport'), ('entertainment', 'Entertainment'), ('shopping', 'Shopping'), ('bills', 'Bills'), ('health', 'Health'), ('education', 'Education'), ('other', 'Other')], max_length=20)),
+                ('match_type', models.CharField(choices=[('contains', 'Description contains'), ('regex', 'Description matches regex')], default='contains', max_length=10)),
+                ('pattern', models.CharField(blank=True, max_length=200)),
+                ('min_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('max_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('priority', models.PositiveIntegerField(default=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_rules', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['priority', 'id'],
+            },
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:10
+
+from django.db import migrations, models
+from django.db.models import BigIntegerField, DecimalField, ExpressionWrapper, F, Value
+from django.db.models.functions import Cast, Round
+
+
+def to_cents(field):
+    return Cast(Round(F(field) * 100), BigIntegerField())
+
+
+def from_cents(field):
+    return ExpressionWrapper(F(field) / Value(100.0), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def amounts_to_cents(apps, schema_editor):
+    for name in ('Expense', 'ArchivedExpense'):
+        apps.get_model('expenses', name).objects.update(amount_cents=to_cents('amount'))
+    CategoryRule = apps.get_model('expenses', 'CategoryRule')
+    CategoryRule.objects.filter(min_amount__isnull=False).update(min_amount_cents=to_cents('min_amount'))
+    CategoryRule.objects.filter(max_amount__isnull=False).update(max_amount_cents=to_cents('max_amount'))
+
+
+def cents_to_amounts(apps, schema_editor):
+    for name in ('Expense', 'ArchivedExpense'):
+        apps.get_model('expenses', name).objects.update(amount=from_cents('amount_cents'))
+    CategoryRule = apps.get_model('expenses', 'CategoryRule')
+    CategoryRule.objects.filter(min_amount_cents__isnull=False).update(min_amount=from_cents('min_amount_cents'))
+    CategoryRule.objects.filter(max_amount_cents__isnull=False).update(max_amount=from_cents('max_amount_cents'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0007_categoryrule'),
+        # The daily totals backfill reads Expense.amount, so it must run first
+        ('reports', '0002_dailytotal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='amount_cents',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedexpense',
+            name='amount_cents',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='categoryrule',
+            name='min_amount_cents',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='categoryrule',
+            name='max_amount_cents',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        # Nullable while the data moves, so the migration can also be reversed
+        migrations.AlterField(
+            model_name='expense',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='archivedexpense',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.RunPython(amounts_to_cents, cents_to_amounts),
+        migrations.RemoveField(
+            model_name='expense',
+            name='amount',
+        ),
+        migrations.RemoveField(
+            model_name='archivedexpense',
+            name='amount',
+        ),
+        migrations.RemoveField(
+            model_name='categoryrule',
+            name='min_amount',
+        ),
+        migrations.RemoveField(
+            model_name='categoryrule',
+            name='max_amount',
+        ),
+        migrations.AlterField(
+            model_name='expense',
+            name='amount_cents',
+            field=models.BigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='archivedexpense',
+            name='amount_cents',
+            field=models.BigIntegerField(),
+        ),
+    ]
@@ -1,31 +1,266 @@
-from django.db import models
-from django.contrib.auth import get_user_model
-
-User = get_user_model()
-
-
-class Expense(models.Model):
-    CATEGORY_CHOICES = [
-        ('food', 'Food'),
-        ('transport', 'Transport'),
-        ('entertainment', 'Entertainment'),
-        ('shopping', 'Shopping'),
-        ('bills', 'Bills'),
-        ('health', 'Health'),
-        ('education', 'Education'),
-        ('other', 'Other'),
-    ]
-    
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='expenses')
-    amount = models.DecimalField(max_digits=10, decimal_places=2)
-    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
-    date = models.DateField()
-    description = models.TextField(blank=True, null=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
-    
-    class Meta:
-        ordering = ['-date', '-created_at']
-    
-    def __str__(self):
-        return f"{self.user.username} - {self.amount} ({self.category})"
+from django.db import models, transaction
+from django.contrib.auth import get_user_model
+from .money import cents_to_decimal, to_cents
+
+User = get_user_model()
+
+
+class Expense(models.Model):
+    CATEGORY_CHOICES = [
+        ('food', 'Food'),
+        ('transport', 'Transport'),
+        ('entertainment', 'Entertainment'),
+        ('shopping', 'Shopping'),
+        ('bills', 'Bills'),
+        ('health', 'Health'),
+        ('education', 'Education'),
+        ('other', 'Other'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='expenses')
+    amount_cents = models.BigIntegerField()
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
+    date = models.DateField()
+    description = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=1)
+    
+    class Meta:
+        ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['user', 'updated_at'], name='expense_user_updated_idx'),
+            models.Index(fields=['user', 'date'], name='expense_user_date_idx'),
+            models.Index(fields=['-date', '-created_at'], name='expense_date_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.amount} ({self.category})"
+    
+    @property
+    def amount(self):
+        return cents_to_decimal(self.amount_cents)
+    
+    @amount.setter
+    def amount(self, value):
+        self.amount_cents = to_cents(value)
+    
+    # Single expenses saved or deleted by the admin, scripts and the create endpoint
+    # keep the derived data and the change feed in step here. The set-based helpers
+    # in expenses.utils write with update(), bulk_create() and QuerySet.delete(),
+    # which bypass these methods, and do the same bookkeeping for the whole set.
+    
+    def save(self, *args, **kwargs):
+        from reports.utils import adjust_daily_totals, invalidate_category_stats
+        from .events import record_expense_events
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not update_fields:
+            # Django writes nothing for an empty update_fields
+            return
+        
+        with transaction.atomic(using=kwargs.get('using')):
+            previous = None
+            if not self._state.adding:
+                previous = Expense.objects.select_for_update().filter(pk=self.pk).values(
+                    'amount_cents', 'category', 'date', 'description', 'version'
+                ).first()
+            if previous is not None:
+                # Clients holding the old ETag must not overwrite this change
+                self.version = previous['version'] + 1
+                if update_fields is not None:
+                    update_fields = kwargs['update_fields'] = {*update_fields, 'version', 'updated_at'}
+            super().save(*args, **kwargs)
+            
+            # A partial save leaves the fields it does not write at their stored values
+            written = self
+            if previous is not None and update_fields is not None:
+                written = Expense(pk=self.pk, user_id=self.user_id, version=self.version, **{
+                    field: getattr(self, field) if field in update_fields else value
+                    for field, value in previous.items() if field != 'version'
+                })
+            
+            deltas = {written.date: written.amount_cents}
+            if previous is not None:
+                deltas[previous['date']] = deltas.get(previous['date'], 0) - previous['amount_cents']
+            adjust_daily_totals(self.user, deltas)
+            if update_fields is None or update_fields & {'amount_cents', 'category', 'date'}:
+                invalidate_category_stats(self.user, {(day.year, day.month) for day in deltas})
+            record_expense_events('created' if previous is None else 'updated', [written])
+    
+    def delete(self, *args, **kwargs):
+        from reports.utils import adjust_daily_totals, invalidate_category_stats
+        from .events import record_deleted_events
+        
+        with transaction.atomic(using=kwargs.get('using')):
+            previous = Expense.objects.select_for_update().filter(pk=self.pk).values('date', 'amount_cents').first()
+            if previous is not None:
+                ExpenseTombstone.objects.create(user_id=self.user_id, expense_id=self.pk)
+                record_deleted_events(Expense.objects.filter(pk=self.pk))
+            self.attachments.all().delete()
+            result = super().delete(*args, **kwargs)
+            if previous is not None:
+                adjust_daily_totals(self.user, {previous['date']: -previous['amount_cents']})
+                invalidate_category_stats(self.user, {(previous['date'].year, previous['date'].month)})
+        return result
+
+
+class ExpenseTombstone(models.Model):
+    """Records a deleted expense so sync clients can learn about the delete"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='expense_tombstones')
+    expense_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at'], name='tombstone_user_deleted_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - expense {self.expense_id} deleted"
+
+
+class ArchivedExpense(models.Model):
+    """Cold storage for old expenses moved out of the hot table by archive_expenses"""
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_expenses')
+    amount_cents = models.BigIntegerField()
+    category = models.CharField(max_length=20, choices=Expense.CATEGORY_CHOICES)
+    date = models.DateField()
+    description = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    version = models.PositiveIntegerField(default=1)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['user', 'date'], name='archived_user_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.amount} ({self.category}) [archived]"
+    
+    @property
+    def amount(self):
+        return cents_to_decimal(self.amount_cents)
+
+
+class ArchiveWatermark(models.Model):
+    """Marks that a user's expenses dated before archived_before may live in the archive"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='archive_watermark')
+    archived_before = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user.username} - archived before {self.archived_before}"
+
+
+class ReceiptBlob(models.Model):
+    """A stored receipt file, addressed by the SHA-256 of its content"""
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.PositiveBigIntegerField()
+    content_type = models.CharField(max_length=100)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.sha256} ({self.content_type}, {self.size} bytes)"
+
+
+class Attachment(models.Model):
+    """A receipt attached to an expense.
+    
+    The expense foreign key has no database constraint because attachments keep
+    pointing at the same id after archive_expenses moves the expense into
+    ArchivedExpense. Deleting expenses removes their attachments explicitly
+    (see delete_expenses), which keeps the expense DELETE a single statement.
+    """
+    expense = models.ForeignKey(
+        Expense,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='attachments'
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='attachments')
+    blob = models.ForeignKey(ReceiptBlob, on_delete=models.PROTECT, related_name='attachments')
+    filename = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['created_at']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.filename} (expense {self.expense_id})"
+
+
+class CategoryRule(models.Model):
+    """A user-defined rule that picks the category of new expenses"""
+    MATCH_CHOICES = [
+        ('contains', 'Description contains'),
+        ('regex', 'Description matches regex'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='category_rules')
+    category = models.CharField(max_length=20, choices=Expense.CATEGORY_CHOICES)
+    match_type = models.CharField(max_length=10, choices=MATCH_CHOICES, default='contains')
+    pattern = models.CharField(max_length=200, blank=True)
+    min_amount_cents = models.BigIntegerField(null=True, blank=True)
+    max_amount_cents = models.BigIntegerField(null=True, blank=True)
+    priority = models.PositiveIntegerField(default=100)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['priority', 'id']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.pattern or 'any'} -> {self.category}"
+
+
+class ExpenseEvent(models.Model):
+    """An outbox row recording an expense write, stored in the write's own transaction"""
+    ACTION_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='expense_events')
+    expense_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    payload = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['user', 'id'], name='event_user_id_idx'),
+            models.Index(fields=['created_at'], name='event_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - expense {self.expense_id} {self.action}"
+
+
+class WebhookEndpoint(models.Model):
+    """A URL that receives a user's expense events in signed batches.
+    
+    last_event_id is the delivery cursor: every event of the user with a
+    higher id is still to be delivered, in id order.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='webhook_endpoints')
+    url = models.URLField(max_length=500)
+    secret = models.CharField(max_length=64)
+    is_active = models.BooleanField(default=True)
+    last_event_id = models.BigIntegerField(default=0)
+    failure_count = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['created_at']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.url}"
@@ -0,0 +1,30 @@
+"""
+Money amounts as integer cents.
+
+Amounts are stored and summed as integers, so database aggregates are exact
+and no Decimal objects are built on the hot paths. They are converted to
+two-decimal strings only when rendered.
+"""
+from decimal import Decimal
+
+
+def to_cents(amount):
+    """Convert a decimal amount (Decimal, str, int or float) to integer cents"""
+    return int((Decimal(str(amount)) * 100).to_integral_value())
+
+
+def cents_to_decimal(cents):
+    """Convert integer cents to a two-decimal Decimal"""
+    return Decimal(cents).scaleb(-2)
+
+
+def format_cents(cents):
+    """Render integer cents as a two-decimal string such as '12.50'"""
+    sign = '-' if cents < 0 else ''
+    whole, part = divmod(abs(cents), 100)
+    return f'{sign}{whole}.{part:02d}'
+
+
+def cents_to_number(cents):
+    """Render integer cents as a plain number such as 12.5, the JSON type report totals are sent as"""
+    return cents / 100
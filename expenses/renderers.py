@@ -0,0 +1,59 @@
+"""
+Compact renderers for large expense lists.
+
+ColumnarJSONRenderer turns a list of objects into one array per field, so the
+field names are sent once instead of once per row. MessagePackRenderer encodes
+the same list as binary MessagePack; it is only offered when the optional
+`msgpack` package is installed.
+"""
+from functools import lru_cache
+from importlib import import_module
+from importlib.util import find_spec
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+
+
+def to_columns(data):
+    """Convert a list of flat dicts to {'count': n, 'columns': {field: [values, ...]}}"""
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        return data
+    fields = list(data[0]) if data else []
+    return {
+        'count': len(data),
+        'columns': {field: [row[field] for row in data] for field in fields},
+    }
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    media_type = 'application/vnd.expense-tracker.columnar+json'
+    format = 'columnar'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(to_columns(data), accepted_media_type, renderer_context)
+
+
+@lru_cache(maxsize=None)
+def has_msgpack():
+    return find_spec('msgpack') is not None
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Serializer output is already primitive apart from the odd Decimal or date
+        return import_module('msgpack').packb(data, default=str, use_bin_type=True)
+
+
+def get_list_renderer_classes():
+    """Renderers for list endpoints: the defaults plus the compact encodings available here"""
+    renderers = list(api_settings.DEFAULT_RENDERER_CLASSES) + [ColumnarJSONRenderer]
+    if has_msgpack():
+        renderers.append(MessagePackRenderer)
+    return renderers
@@ -0,0 +1,180 @@
+"""
+Rule-based expense categorization.
+
+A user's rules are compiled into a single regular expression: an alternation of
+anchored lookaheads, one per rule in priority order. The first rule whose
+pattern occurs anywhere in the description wins, and its group name tells which
+one it was. Categorizing an expense is therefore one call into the regex engine
+instead of a Python loop over the rules, although the engine still scans the
+description once per rule until one matches. Compiled matchers are cached per
+process and rebuilt when the user's rules change.
+
+Rules run in the request path, so user regexes are limited to syntax whose
+matching time stays bounded: at most one unbounded quantifier, a small number
+of ways for the bounded quantifiers and alternations to match, no quantifier
+repeating a group that can match in more than one way, no backreferences,
+short patterns, and only the start of a long description is matched.
+"""
+import re
+import threading
+from collections import OrderedDict
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+from django.db.models import Count, Max
+from .models import CategoryRule
+
+DEFAULT_CATEGORY = 'other'
+MATCHER_CACHE_SIZE = 256
+REGEX_PATTERN_MAX_LENGTH = 100
+REGEX_MAX_CHOICES = 16
+DESCRIPTION_MATCH_LENGTH = 1000
+
+REPEAT_OPS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+REPEAT_OPS.add(getattr(sre_constants, 'POSSESSIVE_REPEAT', sre_constants.MAX_REPEAT))
+
+_matchers = OrderedDict()
+_matchers_lock = threading.Lock()
+
+
+def rule_pattern(match_type, pattern):
+    """Return the regex source matching a rule's description condition"""
+    if not pattern:
+        return ''
+    if match_type == 'contains':
+        return re.escape(pattern)
+    return f'(?:{pattern})'
+
+
+def _count_choices(items):
+    """Count the ways parsed regex items can match at one position.
+    
+    Returns the product of the choices offered by bounded quantifiers and
+    alternations, and the number of unbounded quantifiers. Raises ValueError
+    for backreferences and for repeated groups that can match in several ways.
+    """
+    choices, unbounded = 1, 0
+    for op, av in items:
+        if op in REPEAT_OPS:
+            low, high, body = av
+            body_choices, body_unbounded = _count_choices(body)
+            if high > 1 and (body_choices > 1 or body_unbounded):
+                raise ValueError('Quantifiers cannot repeat a group that holds a quantifier or an alternation.')
+            if high == sre_constants.MAXREPEAT:
+                unbounded += 1
+            else:
+                choices *= (high - low + 1) * body_choices
+                unbounded += body_unbounded
+        elif op is sre_constants.BRANCH:
+            counts = [_count_choices(branch) for branch in av[1]]
+            choices *= sum(count[0] for count in counts)
+            unbounded += max(count[1] for count in counts)
+        elif op is sre_constants.SUBPATTERN or op is getattr(sre_constants, 'ATOMIC_GROUP', None):
+            body_choices, body_unbounded = _count_choices(av[-1] if op is sre_constants.SUBPATTERN else av)
+            choices *= body_choices
+            unbounded += body_unbounded
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            body_choices, body_unbounded = _count_choices(av[1])
+            choices *= body_choices
+            unbounded += body_unbounded
+        elif op in (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS):
+            raise ValueError('Backreferences are not supported.')
+    return choices, unbounded
+
+
+def validate_rule_pattern(match_type, pattern):
+    """Raise ValueError when a pattern cannot be merged into a combined matcher or may backtrack badly"""
+    if match_type != 'regex' or not pattern:
+        return
+    if len(pattern) > REGEX_PATTERN_MAX_LENGTH:
+        raise ValueError(f'Regular expressions are limited to {REGEX_PATTERN_MAX_LENGTH} characters.')
+    
+    try:
+        compiled = re.compile(f'(?=.*?{rule_pattern(match_type, pattern)})', re.IGNORECASE | re.DOTALL)
+        parsed = sre_parse.parse(pattern, re.IGNORECASE | re.DOTALL)
+    except re.error as exc:
+        raise ValueError(f'Invalid regular expression: {exc}')
+    # Group names and numbers shift once rules are merged, so references cannot work
+    if compiled.groupindex or re.search(r'\\[1-9]|\(\?P=', pattern):
+        raise ValueError('Named groups and backreferences are not supported.')
+    
+    # Every extra unbounded quantifier multiplies the work by the description length
+    choices, unbounded = _count_choices(parsed)
+    if unbounded > 1:
+        raise ValueError('Only one unbounded quantifier (*, + or {n,}) is allowed per pattern.')
+    if choices > REGEX_MAX_CHOICES:
+        raise ValueError('The pattern has too many optional parts and alternatives.')
+
+
+class CategoryMatcher:
+    """Picks the category of the highest priority rule matching an expense"""
+    
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._regexes = {}
+    
+    def _regex(self, start):
+        """Compile the merged matcher for the rules from index start onwards"""
+        if start not in self._regexes:
+            alternatives = [
+                f'(?=.*?(?P<r{index}>{rule_pattern(rule.match_type, rule.pattern)}))'
+                for index, rule in enumerate(self.rules[start:], start)
+            ]
+            self._regexes[start] = re.compile(
+                '^(?:' + '|'.join(alternatives) + ')',
+                re.IGNORECASE | re.DOTALL
+            )
+        return self._regexes[start]
+    
+    def categorize(self, description, amount_cents):
+        """Return the category for an expense, or None when no rule matches"""
+        description = (description or '')[:DESCRIPTION_MATCH_LENGTH]
+        start = 0
+        while start < len(self.rules):
+            match = self._regex(start).match(description)
+            if match is None:
+                return None
+            
+            index = int(match.lastgroup[1:])
+            rule = self.rules[index]
+            if (
+                (rule.min_amount_cents is None or amount_cents >= rule.min_amount_cents)
+                and (rule.max_amount_cents is None or amount_cents <= rule.max_amount_cents)
+            ):
+                return rule.category
+            # The description matched but the amount did not; resume after that rule
+            start = index + 1
+        return None
+
+
+def get_rules_version(user):
+    """Fingerprint a user's rules so cached matchers can tell when they changed"""
+    state = CategoryRule.objects.filter(user=user).aggregate(count=Count('id'), changed=Max('updated_at'))
+    return state['count'], state['changed']
+
+
+def get_category_matcher(user):
+    """Return the user's compiled matcher, rebuilding it only when their rules changed"""
+    version = get_rules_version(user)
+    with _matchers_lock:
+        cached = _matchers.get(user.pk)
+        if cached is not None and cached[0] == version:
+            _matchers.move_to_end(user.pk)
+            return cached[1]
+    
+    matcher = CategoryMatcher(CategoryRule.objects.filter(user=user).order_by('priority', 'id'))
+    with _matchers_lock:
+        _matchers[user.pk] = (version, matcher)
+        _matchers.move_to_end(user.pk)
+        while len(_matchers) > MATCHER_CACHE_SIZE:
+            _matchers.popitem(last=False)
+    return matcher
+
+
+def categorize(matcher, description, amount_cents):
+    """Pick a category with a matcher, falling back to DEFAULT_CATEGORY"""
+    return matcher.categorize(description, amount_cents) or DEFAULT_CATEGORY
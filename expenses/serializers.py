@@ -1,21 +1,191 @@
-from rest_framework import serializers
-from .models import Expense
-
-
-class ExpenseSerializer(serializers.ModelSerializer):
-    user = serializers.ReadOnlyField(source='user.username')
-    
-    class Meta:
-        model = Expense
-        fields = ['id', 'user', 'amount', 'category', 'date', 'description', 'created_at']
-        read_only_fields = ['id', 'user', 'created_at']
-
-
-class ExpenseCreateSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Expense
-        fields = ['amount', 'category', 'date', 'description']
-    
-    def create(self, validated_data):
-        validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
+from django.conf import settings
+from rest_framework import serializers
+from .attachments import prefetch_attachment_ids
+from .events import UnsafeWebhookURL, check_webhook_url, generate_webhook_secret, latest_event_id
+from .models import Attachment, CategoryRule, Expense, WebhookEndpoint
+from .money import format_cents, to_cents
+from .rules import categorize, get_category_matcher, validate_rule_pattern
+
+
+class CentsField(serializers.DecimalField):
+    """A two-decimal amount sent as a string like '12.50' and stored as integer cents"""
+    
+    def __init__(self, max_digits=10, decimal_places=2, **kwargs):
+        super().__init__(max_digits, decimal_places, **kwargs)
+    
+    def to_internal_value(self, data):
+        return to_cents(super().to_internal_value(data))
+    
+    def to_representation(self, value):
+        return format_cents(value)
+
+
+class ExpenseSerializer(serializers.ModelSerializer):
+    user = serializers.ReadOnlyField(source='user.username')
+    amount = CentsField(source='amount_cents')
+    attachment_ids = serializers.SerializerMethodField()
+    attachment_count = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Expense
+        fields = [
+            'id', 'user', 'amount', 'category', 'date', 'description', 'created_at', 'updated_at', 'version',
+            'attachment_ids', 'attachment_count'
+        ]
+        read_only_fields = ['id', 'user', 'created_at', 'updated_at', 'version']
+    
+    def get_attachment_ids(self, expense):
+        # Lists load these for all rows up front with prefetch_attachment_ids
+        if not hasattr(expense, 'attachment_ids'):
+            prefetch_attachment_ids([expense])
+        return expense.attachment_ids
+    
+    def get_attachment_count(self, expense):
+        return len(self.get_attachment_ids(expense))
+
+
+class ExpenseCreateSerializer(serializers.ModelSerializer):
+    amount = CentsField(source='amount_cents')
+    
+    class Meta:
+        model = Expense
+        fields = ['amount', 'category', 'date', 'description']
+        extra_kwargs = {'category': {'required': False}}
+    
+    def create(self, validated_data):
+        validated_data['user'] = self.context['request'].user
+        if 'category' not in validated_data:
+            validated_data['category'] = categorize(
+                get_category_matcher(validated_data['user']),
+                validated_data.get('description'),
+                validated_data['amount_cents']
+            )
+        return super().create(validated_data)
+
+
+class ExpenseImportRowSerializer(serializers.Serializer):
+    amount = CentsField(source='amount_cents')
+    category = serializers.ChoiceField(choices=Expense.CATEGORY_CHOICES, required=False)
+    date = serializers.DateField()
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
+class ExpenseImportSerializer(serializers.Serializer):
+    expenses = ExpenseImportRowSerializer(many=True, allow_empty=False, max_length=50000)
+
+
+class ExpenseBulkFilterSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    category = serializers.ChoiceField(choices=Expense.CATEGORY_CHOICES, required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError('At least one filter is required.')
+        return attrs
+
+
+class ExpenseBulkDeleteSerializer(serializers.Serializer):
+    filter = ExpenseBulkFilterSerializer()
+
+
+class ExpenseBulkUpdateSerializer(serializers.Serializer):
+    filter = ExpenseBulkFilterSerializer()
+    update = serializers.DictField()
+    
+    def validate_update(self, value):
+        fields = ExpenseCreateSerializer(data=value, partial=True)
+        fields.is_valid(raise_exception=True)
+        changes = dict(fields.validated_data)
+        
+        # Amount and date changes would move report totals between months
+        unsupported = set(changes) - {'category', 'description'}
+        if unsupported:
+            names = {field.source: name for name, field in fields.fields.items()}
+            raise serializers.ValidationError(
+                f"Bulk updates cannot change: {', '.join(sorted(names[source] for source in unsupported))}."
+            )
+        if not changes:
+            raise serializers.ValidationError('Nothing to update.')
+        return changes
+
+
+class AttachmentSerializer(serializers.ModelSerializer):
+    content_type = serializers.ReadOnlyField(source='blob.content_type')
+    size = serializers.ReadOnlyField(source='blob.size')
+    sha256 = serializers.ReadOnlyField(source='blob.sha256')
+    
+    class Meta:
+        model = Attachment
+        fields = ['id', 'expense', 'filename', 'content_type', 'size', 'sha256', 'created_at']
+        read_only_fields = fields
+
+
+class CategoryRuleSerializer(serializers.ModelSerializer):
+    min_amount = CentsField(source='min_amount_cents', required=False, allow_null=True)
+    max_amount = CentsField(source='max_amount_cents', required=False, allow_null=True)
+    
+    class Meta:
+        model = CategoryRule
+        fields = [
+            'id', 'category', 'match_type', 'pattern', 'min_amount', 'max_amount', 'priority',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def validate(self, attrs):
+        values = {field.source: getattr(self.instance, field.source, None) for field in self.fields.values()}
+        values.update(attrs)
+        minimum, maximum = values['min_amount_cents'], values['max_amount_cents']
+        
+        if not values['pattern'] and minimum is None and maximum is None:
+            raise serializers.ValidationError('A rule needs a pattern or an amount range.')
+        if minimum is not None and maximum is not None and minimum > maximum:
+            raise serializers.ValidationError({'max_amount': 'Must not be less than min_amount.'})
+        try:
+            validate_rule_pattern(values['match_type'] or 'contains', values['pattern'])
+        except ValueError as exc:
+            raise serializers.ValidationError({'pattern': str(exc)})
+        return attrs
+    
+    def create(self, validated_data):
+        validated_data['user'] = self.context['request'].user
+        return super().create(validated_data)
+
+
+class ExpenseEventQuerySerializer(serializers.Serializer):
+    after = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+    wait = serializers.IntegerField(min_value=0, max_value=settings.EXPENSE_EVENT_MAX_WAIT, default=0)
+
+
+class WebhookEndpointSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WebhookEndpoint
+        fields = [
+            'id', 'url', 'is_active', 'last_event_id', 'failure_count', 'next_attempt_at', 'last_error',
+            'created_at'
+        ]
+        read_only_fields = ['id', 'last_event_id', 'failure_count', 'next_attempt_at', 'last_error', 'created_at']
+    
+    def validate_url(self, value):
+        try:
+            check_webhook_url(value)
+        except UnsafeWebhookURL as exc:
+            raise serializers.ValidationError(str(exc))
+        return value
+    
+    def create(self, validated_data):
+        user = self.context['request'].user
+        validated_data['user'] = user
+        validated_data['secret'] = generate_webhook_secret()
+        # New endpoints receive changes made from now on, not the retained history
+        validated_data['last_event_id'] = latest_event_id(user)
+        return super().create(validated_data)
+    
+    def update(self, instance, validated_data):
+        if validated_data.get('is_active') and not instance.is_active:
+            # Re-enabling an endpoint retries it straight away
+            validated_data.update(failure_count=0, next_attempt_at=None)
+        return super().update(instance, validated_data)
@@ -0,0 +1,206 @@
+"""
+Per-user snapshots for moving an account between databases and seeding test data.
+
+A snapshot is NDJSON, optionally gzipped. The first line is a header object
+with the user, the row counts and the column names of each record type. Every
+following line is a compact JSON array whose first element is the record type:
+  "c"  a category rule
+  "e"  an expense (live or archived)
+  "r"  a month that had a stored report
+
+Loading creates the user and inserts the expenses in batches with a single
+prepared INSERT, keeping their original timestamps. Daily totals and the
+stored reports are then recomputed from a single grouped query, instead of
+being adjusted once per expense. When asked to, Expense's secondary indexes
+are dropped first and rebuilt once at the end.
+"""
+import gzip
+import io
+import json
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Sum
+from reports.models import DailyTotal, Report
+from .models import ArchivedExpense, CategoryRule, Expense
+
+User = get_user_model()
+
+SNAPSHOT_FORMAT = 'expense-tracker-user'
+SNAPSHOT_VERSION = 1
+
+USER_FIELDS = ['username', 'email', 'password', 'first_name', 'last_name', 'is_active', 'date_joined']
+COLUMNS = {
+    'c': ['category', 'match_type', 'pattern', 'min_amount_cents', 'max_amount_cents', 'priority'],
+    'e': ['amount_cents', 'category', 'date', 'description', 'created_at', 'updated_at', 'version'],
+    'r': ['year', 'month'],
+}
+
+
+def open_snapshot(path, mode):
+    """Open a snapshot file for text I/O, gzipped when the name ends in .gz or the content is gzip"""
+    if 'r' in mode:
+        raw = open(path, 'rb')
+        if raw.peek(2)[:2] == b'\x1f\x8b':
+            return io.TextIOWrapper(gzip.GzipFile(fileobj=raw), encoding='utf-8')
+        return io.TextIOWrapper(raw, encoding='utf-8')
+    if str(path).endswith('.gz'):
+        return gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+    return open(path, 'w', encoding='utf-8')
+
+
+def _line(record):
+    return json.dumps(record, default=str, separators=(',', ':')) + '\n'
+
+
+def dump_user(user, stream, chunk_size=5000):
+    """Write a user's snapshot to a text stream and return the row counts"""
+    rules = CategoryRule.objects.filter(user=user).order_by('priority', 'id')
+    sources = [Expense.objects.filter(user=user), ArchivedExpense.objects.filter(user=user)]
+    reports = Report.objects.filter(user=user).order_by('year', 'month')
+    counts = {
+        'c': rules.count(),
+        'e': sum(source.count() for source in sources),
+        'r': reports.count(),
+    }
+    
+    stream.write(_line({
+        'format': SNAPSHOT_FORMAT,
+        'version': SNAPSHOT_VERSION,
+        'user': {field: getattr(user, field) for field in USER_FIELDS},
+        'counts': counts,
+        'columns': COLUMNS,
+    }))
+    for kind, rows in [
+        ('c', rules.values_list(*COLUMNS['c'])),
+        *(('e', source.order_by('pk').values_list(*COLUMNS['e']).iterator(chunk_size=chunk_size)) for source in sources),
+        ('r', reports.values_list(*COLUMNS['r'])),
+    ]:
+        stream.writelines(_line([kind, *row]) for row in rows)
+    return counts
+
+
+def read_header(stream):
+    header = json.loads(stream.readline() or 'null')
+    if not isinstance(header, dict) or header.get('format') != SNAPSHOT_FORMAT:
+        raise ValueError('Not an expense tracker user snapshot.')
+    if header.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {header.get('version')}.")
+    return header
+
+
+@contextmanager
+def deferred_indexes(model, enabled=True):
+    """Drop a model's Meta.indexes for the duration of a bulk load and rebuild them afterwards"""
+    indexes = list(model._meta.indexes) if enabled else []
+    if indexes:
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.remove_index(model, index)
+    try:
+        yield
+    finally:
+        if indexes:
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.add_index(model, index)
+
+
+EXPENSE_INSERT_COLUMNS = ['user_id', *COLUMNS['e']]
+
+
+def expense_insert_sql():
+    columns = ', '.join(connection.ops.quote_name(column) for column in EXPENSE_INSERT_COLUMNS)
+    placeholders = ', '.join(['%s'] * len(EXPENSE_INSERT_COLUMNS))
+    return f'INSERT INTO {Expense._meta.db_table} ({columns}) VALUES ({placeholders})'
+
+
+def expense_params(ops, user_id, row, columns):
+    """Turn a snapshot expense row into INSERT parameters in EXPENSE_INSERT_COLUMNS order"""
+    values = dict(zip(columns, row))
+    return [
+        user_id,
+        values['amount_cents'],
+        values['category'],
+        ops.adapt_datefield_value(date.fromisoformat(values['date'])),
+        values['description'],
+        ops.adapt_datetimefield_value(datetime.fromisoformat(values['created_at'])),
+        ops.adapt_datetimefield_value(datetime.fromisoformat(values['updated_at'])),
+        values['version'],
+    ]
+
+
+def rebuild_derived_totals(user, report_months):
+    """Recompute a user's daily totals and the given months' reports from one grouped query"""
+    daily = dict(
+        Expense.objects.filter(user=user).order_by().values('date')
+        .annotate(total_cents=Sum('amount_cents')).values_list('date', 'total_cents')
+    )
+    DailyTotal.objects.filter(user=user).delete()
+    DailyTotal.objects.bulk_create(
+        DailyTotal(user=user, date=day, total_cents=cents) for day, cents in daily.items()
+    )
+    
+    monthly = {}
+    for day, cents in daily.items():
+        monthly[(day.year, day.month)] = monthly.get((day.year, day.month), 0) + cents
+    Report.objects.filter(user=user).delete()
+    Report.objects.bulk_create(
+        Report(user=user, year=year, month=month, total_cents=monthly.get((year, month), 0))
+        for year, month in sorted(report_months)
+    )
+
+
+def load_user(stream, username=None, email=None, batch_size=5000, defer_indexes=False):
+    """Create a user from a snapshot stream; returns the user and the rows loaded per record type.
+    
+    Expenses all land in the live table, including ones that were archived in
+    the source database. defer_indexes=True drops the expense indexes for the
+    load and rebuilds them at the end. That takes a schema lock on the shared
+    table, so it is only worth it for a large load into a quiet database.
+    """
+    header = read_header(stream)
+    columns = header['columns']
+    user_data = dict(header['user'])
+    if username:
+        user_data['username'] = username
+    if email:
+        user_data['email'] = email
+    if User.objects.filter(username=user_data['username']).exists():
+        raise ValueError(f"User {user_data['username']} already exists.")
+    if User.objects.filter(email=user_data['email']).exists():
+        raise ValueError(f"A user with email {user_data['email']} already exists.")
+    
+    loaded = {'c': 0, 'e': 0, 'r': 0}
+    report_months = set()
+    insert_sql = expense_insert_sql()
+    ops = connection.ops
+    with deferred_indexes(Expense, defer_indexes), transaction.atomic(), connection.cursor() as cursor:
+        user = User(**user_data)
+        user.date_joined = datetime.fromisoformat(user_data['date_joined'])
+        user.save()
+        
+        rules, expenses = [], []
+        for line in stream:
+            kind, *row = json.loads(line)
+            if kind == 'e':
+                expenses.append(expense_params(ops, user.pk, row, columns['e']))
+                if len(expenses) >= batch_size:
+                    cursor.executemany(insert_sql, expenses)
+                    loaded['e'] += len(expenses)
+                    expenses = []
+            elif kind == 'c':
+                rules.append(CategoryRule(user=user, **dict(zip(columns['c'], row))))
+            elif kind == 'r':
+                report_months.add(tuple(row))
+        if expenses:
+            cursor.executemany(insert_sql, expenses)
+            loaded['e'] += len(expenses)
+        CategoryRule.objects.bulk_create(rules)
+        loaded['c'] = len(rules)
+        
+        rebuild_derived_totals(user, report_months)
+        loaded['r'] = len(report_months)
+    return user, loaded
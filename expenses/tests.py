@@ -0,0 +1,622 @@
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from expense_tracker.compression import choose_encoding, has_brotli, parse_accept_encoding
+from reports.models import DailyTotal, Report
+from .archive import archive_expenses
+from .attachments import get_blob_path, has_pillow, prune_receipt_blobs
+from .events import SIGNATURE_HEADER, dispatch_events
+from .models import (
+    ArchivedExpense, Attachment, CategoryRule, Expense, ExpenseEvent, ExpenseTombstone, ReceiptBlob,
+    WebhookEndpoint
+)
+from .money import cents_to_number, format_cents, to_cents
+from .renderers import ColumnarJSONRenderer, has_msgpack, to_columns
+from .rules import validate_rule_pattern
+from .snapshot import dump_user, load_user
+
+User = get_user_model()
+
+
+class ExpenseAPITestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def create_expense(self, amount='10.00', category='food', day=date(2025, 8, 3), description='Lunch'):
+        response = self.client.post('/api/expenses/', {
+            'amount': amount,
+            'category': category,
+            'date': day.isoformat(),
+            'description': description,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return Expense.objects.filter(user=self.user).latest('id')
+
+
+class ExpenseConcurrencyTests(ExpenseAPITestCase):
+    def test_if_match(self):
+        expense = self.create_expense()
+        etag = self.client.get(f'/api/expenses/{expense.pk}/')['ETag']
+        self.assertEqual(etag, f'"{expense.pk}-1"')
+        
+        response = self.client.patch(
+            f'/api/expenses/{expense.pk}/', {'description': 'Dinner'}, format='json', HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], f'"{expense.pk}-2"')
+        
+        response = self.client.patch(
+            f'/api/expenses/{expense.pk}/', {'description': 'Brunch'}, format='json', HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(self.client.delete(f'/api/expenses/{expense.pk}/', HTTP_IF_MATCH=etag).status_code, 412)
+        self.assertEqual(Expense.objects.get(pk=expense.pk).description, 'Dinner')
+    
+    def test_orm_save_invalidates_etag(self):
+        expense = self.create_expense()
+        etag = self.client.get(f'/api/expenses/{expense.pk}/')['ETag']
+        expense.description = 'Edited in the admin'
+        expense.save()
+        self.assertEqual(expense.version, 2)
+        
+        response = self.client.patch(
+            f'/api/expenses/{expense.pk}/', {'description': 'Dinner'}, format='json', HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 412)
+
+
+class ExpenseChangesTests(ExpenseAPITestCase):
+    @override_settings(SYNC_CURSOR_LAG=0)
+    def test_changes_since_cursor(self):
+        kept = self.create_expense(description='kept')
+        removed = self.create_expense(description='removed')
+        cursor = self.client.get('/api/expenses/changes/').data['cursor']
+        
+        added = self.create_expense(description='added')
+        self.client.patch(f'/api/expenses/{kept.pk}/', {'description': 'kept, edited'}, format='json')
+        self.client.delete(f'/api/expenses/{removed.pk}/')
+        
+        response = self.client.get('/api/expenses/changes/', {'since': cursor})
+        self.assertEqual([expense['id'] for expense in response.data['created']], [added.pk])
+        self.assertEqual([expense['id'] for expense in response.data['updated']], [kept.pk])
+        self.assertEqual(response.data['deleted'], [removed.pk])
+    
+    def test_invalid_cursor(self):
+        for since in ['x', '9' * 30]:
+            self.assertEqual(self.client.get('/api/expenses/changes/', {'since': since}).status_code, 400)
+
+
+class BulkOperationTests(ExpenseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.lunch = self.create_expense(category='food', day=date(2025, 8, 3))
+        self.rent = self.create_expense(amount='800.00', category='bills', day=date(2025, 8, 1))
+        self.taxi = self.create_expense(category='transport', day=date(2025, 9, 2))
+        other = User.objects.create_user('bob', 'bob@example.com', 'testpass123')
+        self.other = Expense.objects.create(user=other, amount_cents=500, category='food', date=date(2025, 8, 3))
+    
+    def remaining(self):
+        return set(Expense.objects.filter(user=self.user).values_list('pk', flat=True))
+    
+    def test_bulk_delete_filters(self):
+        response = self.client.post('/api/expenses/bulk-delete/', {'filter': {}}, format='json')
+        self.assertEqual(response.status_code, 400)
+        
+        response = self.client.post('/api/expenses/bulk-delete/', {
+            'filter': {'category': 'food', 'date_to': '2025-08-31'},
+        }, format='json')
+        self.assertEqual(response.data, {'deleted': 1})
+        self.assertEqual(self.remaining(), {self.rent.pk, self.taxi.pk})
+        self.assertTrue(Expense.objects.filter(pk=self.other.pk).exists())
+        
+        response = self.client.post('/api/expenses/bulk-delete/', {
+            'filter': {'ids': [self.taxi.pk, self.other.pk]},
+        }, format='json')
+        self.assertEqual(response.data, {'deleted': 1})
+        self.assertEqual(self.remaining(), {self.rent.pk})
+        self.assertEqual(
+            set(ExpenseTombstone.objects.values_list('expense_id', flat=True)), {self.lunch.pk, self.taxi.pk}
+        )
+    
+    def test_bulk_update_filters(self):
+        response = self.client.post('/api/expenses/bulk-update/', {
+            'filter': {'date_from': '2025-08-02'},
+            'update': {'category': 'other', 'description': 'Reviewed'},
+        }, format='json')
+        self.assertEqual(response.data, {'updated': 2})
+        self.assertEqual(
+            set(Expense.objects.filter(category='other').values_list('pk', 'version')),
+            {(self.lunch.pk, 2), (self.taxi.pk, 2)}
+        )
+        self.assertEqual(Expense.objects.get(pk=self.other.pk).category, 'food')
+        
+        response = self.client.post('/api/expenses/bulk-update/', {
+            'filter': {'category': 'bills'},
+            'update': {'amount': '1.00'},
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_deletes_leave_report_totals_correct(self):
+        self.assertEqual(self.report_total(), 0.0)
+        first = self.create_expense(day=date(2025, 10, 1))
+        second = self.create_expense(amount='5.00', day=date(2025, 10, 2))
+        self.client.post('/api/expenses/bulk-delete/', {'filter': {'ids': [first.pk]}}, format='json')
+        self.client.delete(f'/api/expenses/{second.pk}/')
+        
+        self.assertEqual(self.client.get('/api/reports/').data[0]['total_amount'], 0.0)
+        self.assertEqual(self.report_total(), 0.0)
+    
+    def report_total(self):
+        return self.client.get('/api/reports/detail/', {'month': 10, 'year': 2025}).data['total_amount']
+
+
+class ArchiveTests(ExpenseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.old = self.create_expense(amount='4.00', day=date(2024, 1, 10), description='old')
+        self.recent = self.create_expense(day=date(2025, 8, 3), description='recent')
+        self.assertEqual(archive_expenses(date(2025, 1, 1)), 1)
+    
+    def listed(self, **params):
+        response = self.client.get('/api/expenses/', params)
+        self.assertEqual(response.status_code, 200)
+        return [expense['id'] for expense in response.data]
+    
+    def test_archived_expenses_are_listed_only_when_asked_for(self):
+        self.assertEqual(ArchivedExpense.objects.get().pk, self.old.pk)
+        self.assertEqual(self.listed(), [self.recent.pk])
+        self.assertEqual(self.listed(include_archived='true'), [self.recent.pk, self.old.pk])
+        self.assertEqual(self.listed(include_archived='true', ordering='date'), [self.old.pk, self.recent.pk])
+        self.assertEqual(self.listed(include_archived='true', date__gte='2025-01-01'), [self.recent.pk])
+        self.assertEqual(self.client.get(f'/api/expenses/{self.old.pk}/').status_code, 404)
+    
+    def test_reports_include_archived_months(self):
+        response = self.client.get('/api/reports/detail/', {'month': 1, 'year': 2024})
+        self.assertEqual(response.data['total_amount'], 4.0)
+        self.assertEqual(response.data['category_summary'][0]['count'], 1)
+
+
+class DerivedTotalsTests(ExpenseAPITestCase):
+    def totals(self):
+        return dict(DailyTotal.objects.filter(user=self.user).values_list('date', 'total_cents'))
+    
+    def test_orm_writes(self):
+        expense = Expense.objects.create(user=self.user, amount_cents=100, category='food', date=date(2025, 8, 1))
+        self.assertEqual(self.totals(), {date(2025, 8, 1): 100})
+        
+        expense.date = date(2025, 8, 2)
+        expense.amount_cents = 250
+        expense.save()
+        self.assertEqual(self.totals(), {date(2025, 8, 1): 0, date(2025, 8, 2): 250})
+        
+        expense.delete()
+        self.assertEqual(self.totals(), {date(2025, 8, 1): 0, date(2025, 8, 2): 0})
+    
+    def test_admin_bulk_delete(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'testpass123')
+        self.client.force_login(admin)
+        first = self.create_expense(amount='2.00')
+        second = self.create_expense(amount='3.00')
+        
+        response = self.client.post('/admin/expenses/expense/', {
+            'action': 'delete_selected',
+            '_selected_action': [first.pk, second.pk],
+            'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Expense.objects.exists())
+        self.assertEqual(self.totals(), {date(2025, 8, 3): 0})
+        self.assertEqual(ExpenseTombstone.objects.count(), 2)
+    
+    def test_partial_save(self):
+        expense = Expense.objects.create(user=self.user, amount_cents=100, category='food', date=date(2025, 8, 1))
+        expense.amount_cents = 500
+        expense.description = 'Edited'
+        expense.save(update_fields=['description'])
+        
+        stored = Expense.objects.get(pk=expense.pk)
+        self.assertEqual((stored.amount_cents, stored.description, stored.version), (100, 'Edited', 2))
+        self.assertEqual(self.totals(), {date(2025, 8, 1): 100})
+        event = ExpenseEvent.objects.filter(action='updated').get()
+        self.assertEqual((event.payload['amount'], event.payload['version']), ('1.00', 2))
+        
+        expense.save(update_fields=['amount_cents'])
+        self.assertEqual(Expense.objects.get(pk=expense.pk).version, 3)
+        self.assertEqual(self.totals(), {date(2025, 8, 1): 500})
+
+
+class AttachmentTests(ExpenseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+    
+    def upload(self, expense, content, name='receipt.pdf', content_type='application/pdf'):
+        return self.client.post(
+            f'/api/expenses/{expense.pk}/attachments/',
+            {'file': SimpleUploadedFile(name, content, content_type)},
+            format='multipart'
+        )
+    
+    def test_identical_receipts_share_a_blob(self):
+        pdf = b'%PDF-1.4\n' + b'x' * 1000
+        first, second = self.create_expense(), self.create_expense()
+        self.assertEqual(self.upload(first, pdf).status_code, 201)
+        self.assertEqual(self.upload(second, pdf).status_code, 201)
+        self.assertEqual(ReceiptBlob.objects.count(), 1)
+        self.assertEqual(self.upload(first, b'hello', 'note.txt', 'text/plain').status_code, 400)
+        
+        self.client.delete(f'/api/expenses/{first.pk}/')
+        self.assertEqual(prune_receipt_blobs(), 0)
+        self.client.delete(f'/api/expenses/{second.pk}/')
+        sha256 = ReceiptBlob.objects.get().sha256
+        self.assertEqual(prune_receipt_blobs(), 1)
+        self.assertFalse(get_blob_path(sha256).exists())
+    
+    def test_download_and_missing_file(self):
+        pdf = b'%PDF-1.4\n' + b'x' * 1000
+        response = self.upload(self.create_expense(), pdf)
+        url = f"/api/expenses/attachments/{response.data['id']}/"
+        
+        response = self.client.get(url, HTTP_RANGE='bytes=0-4')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-')
+        
+        os.remove(get_blob_path(ReceiptBlob.objects.get().sha256))
+        self.assertEqual(self.client.get(url).status_code, 404)
+    
+    def test_deleting_an_expense_removes_its_attachments(self):
+        expense = self.create_expense()
+        self.upload(expense, b'%PDF-1.4\n')
+        expense.delete()
+        self.assertFalse(Attachment.objects.exists())
+    
+    def test_corrupt_image_thumbnail(self):
+        if not has_pillow():
+            self.skipTest('Pillow is not installed')
+        response = self.upload(self.create_expense(), b'\x89PNG\r\n\x1a\n' + b'garbage' * 100, 'r.png', 'image/png')
+        url = f"/api/expenses/attachments/{response.data['id']}/thumbnail/"
+        for _ in range(100):
+            response = self.client.get(url)
+            if response.status_code != 202:
+                break
+            time.sleep(0.05)
+        self.assertEqual(response.status_code, 422)
+
+
+class CategoryRuleTests(ExpenseAPITestCase):
+    def test_rules_categorize_new_expenses(self):
+        response = self.client.post('/api/expenses/rules/', {'pattern': 'uber', 'category': 'transport'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post('/api/expenses/', {
+            'amount': '12.00',
+            'date': '2025-08-01',
+            'description': 'Uber to airport',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data['category'], 'transport')
+    
+    def test_rejects_backtracking_patterns(self):
+        for pattern in [
+            '(a+)+$',
+            '(a|aa)*b',
+            '(a?a)+',
+            '(?P<x>a)(?P=x)',
+            'a' * 101,
+            'a*a*a*a*a*a*!',
+            r'\w+\s?\w+\s?\w+\s?\w+!',
+            '.*.*.*.*x',
+            'a?a?a?a?a?a*!',
+        ]:
+            with self.assertRaises(ValueError, msg=pattern):
+                validate_rule_pattern('regex', pattern)
+        for pattern in [r'\bnetflix|spotify', r'uber\s*eats?', r'amazon(\.com)?', r'foo.*|bar.*']:
+            validate_rule_pattern('regex', pattern)
+
+
+class EncodingTests(ExpenseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        for day in range(1, 21):
+            self.create_expense(day=date(2025, 8, day), description=f'Lunch {day}')
+    
+    def test_choose_encoding(self):
+        self.assertEqual(parse_accept_encoding('gzip;q=0, br;q=0.5, deflate'), {'br', 'deflate'})
+        self.assertEqual(choose_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(choose_encoding('br, gzip'), 'br' if has_brotli() else 'gzip')
+        self.assertIsNone(choose_encoding('gzip;q=0, identity'))
+    
+    def test_large_responses_are_compressed(self):
+        response = self.client.get('/api/expenses/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))), 20)
+        
+        response = self.client.get('/api/expenses/', HTTP_ACCEPT_ENCODING='identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(len(response.json()), 20)
+    
+    def test_compressed_etags_are_weak(self):
+        expense = self.create_expense(description='x' * 2000)
+        small = Expense.objects.filter(user=self.user).earliest('id')
+        response = self.client.get(f'/api/expenses/{small.pk}/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        
+        response = self.client.get(f'/api/expenses/{expense.pk}/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['ETag'], f'W/"{expense.pk}-1"')
+        response = self.client.patch(
+            f'/api/expenses/{expense.pk}/', {'description': 'Dinner'}, format='json', HTTP_IF_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+    
+    def test_columnar_list(self):
+        self.assertEqual(to_columns([]), {'count': 0, 'columns': {}})
+        response = self.client.get('/api/expenses/', {'ordering': 'date'}, HTTP_ACCEPT=ColumnarJSONRenderer.media_type)
+        self.assertEqual(response['Content-Type'], ColumnarJSONRenderer.media_type)
+        data = json.loads(response.content)
+        self.assertEqual(data['count'], 20)
+        self.assertEqual(data['columns']['description'][:2], ['Lunch 1', 'Lunch 2'])
+        self.assertEqual(set(data['columns']['amount']), {'10.00'})
+        self.assertEqual(self.client.get('/api/expenses/', {'format': 'columnar'}).json()['count'], 20)
+    
+    def test_msgpack_list(self):
+        if not has_msgpack():
+            self.skipTest('msgpack is not installed')
+        import msgpack
+        response = self.client.get('/api/expenses/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(len(msgpack.unpackb(response.content)), 20)
+
+
+class MoneyTests(SimpleTestCase):
+    def test_to_cents(self):
+        self.assertEqual(to_cents('12.50'), 1250)
+        self.assertEqual(to_cents('19.99'), 1999)
+        self.assertEqual(to_cents(0.1), 10)
+        self.assertEqual(to_cents(7), 700)
+    
+    def test_format_cents(self):
+        self.assertEqual(format_cents(1250), '12.50')
+        self.assertEqual(format_cents(5), '0.05')
+        self.assertEqual(format_cents(-5), '-0.05')
+        self.assertEqual(format_cents(0), '0.00')
+    
+    def test_cents_to_number(self):
+        self.assertEqual(cents_to_number(1250), 12.5)
+        self.assertEqual(cents_to_number(30), 0.3)
+
+
+class ExpenseMoneyTests(ExpenseAPITestCase):
+    def test_amounts_are_exact_cents(self):
+        first = self.create_expense(amount='0.10')
+        second = self.create_expense(amount='0.20')
+        self.assertEqual((first.amount_cents, second.amount_cents), (10, 20))
+        
+        response = self.client.get(f'/api/expenses/{first.pk}/')
+        self.assertEqual(response.data['amount'], '0.10')
+        response = self.client.get('/api/reports/detail/', {'month': 8, 'year': 2025})
+        self.assertEqual(response.data['total_amount'], 0.3)
+    
+    def test_rejects_more_than_two_decimals(self):
+        response = self.client.post('/api/expenses/', {
+            'amount': '1.005',
+            'category': 'food',
+            'date': '2025-08-03',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class OutboxTests(ExpenseAPITestCase):
+    def actions(self, expense_id):
+        return list(ExpenseEvent.objects.filter(expense_id=expense_id).order_by('id').values_list('action', flat=True))
+    
+    def test_api_writes_record_events(self):
+        expense = self.create_expense()
+        self.client.patch(f'/api/expenses/{expense.pk}/', {'amount': '12.00'}, format='json')
+        self.client.patch(
+            f'/api/expenses/{expense.pk}/', {'amount': '13.00'}, format='json', HTTP_IF_MATCH=f'"{expense.pk}-1"'
+        )
+        self.client.delete(f'/api/expenses/{expense.pk}/')
+        self.assertEqual(self.actions(expense.pk), ['created', 'updated', 'deleted'])
+        self.assertEqual(ExpenseEvent.objects.get(action='updated').payload['amount'], '12.00')
+    
+    def test_orm_writes_record_events(self):
+        expense, _ = Expense.objects.get_or_create(user=self.user, amount_cents=100, category='food', date=date(2025, 8, 1))
+        expense.description = 'Edited'
+        expense.save()
+        expense_id = expense.pk
+        expense.delete()
+        self.assertEqual(self.actions(expense_id), ['created', 'updated', 'deleted'])
+        self.assertTrue(ExpenseTombstone.objects.filter(expense_id=expense_id).exists())
+    
+    def test_bulk_writes_record_events(self):
+        self.create_expense(category='food')
+        self.create_expense(category='bills')
+        self.client.post('/api/expenses/bulk-update/', {
+            'filter': {'category': 'food'},
+            'update': {'category': 'health'},
+        }, format='json')
+        self.client.post('/api/expenses/bulk-delete/', {'filter': {'category': 'bills'}}, format='json')
+        self.assertEqual(
+            list(ExpenseEvent.objects.order_by('id').values_list('action', flat=True)),
+            ['created', 'created', 'updated', 'deleted']
+        )
+    
+    def test_feed(self):
+        first = self.create_expense()
+        response = self.client.get('/api/expenses/events/')
+        self.assertEqual([event['expense_id'] for event in response.data['events']], [first.pk])
+        
+        cursor = response.data['cursor']
+        response = self.client.get('/api/expenses/events/', {'after': cursor})
+        self.assertEqual((response.data['events'], response.data['cursor']), ([], cursor))
+        self.assertEqual(self.client.get('/api/expenses/events/', {'wait': 6}).status_code, 400)
+
+
+class WebhookReceiver(ThreadingHTTPServer):
+    """A local endpoint that records the requests it gets and answers with a fixed status"""
+    
+    def __init__(self, status=200):
+        self.requests = []
+        self.status = status
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(handler):
+                body = handler.rfile.read(int(handler.headers['Content-Length']))
+                self.requests.append((handler.path, dict(handler.headers), body))
+                handler.send_response(self.status)
+                if self.status in (301, 302):
+                    handler.send_header('Location', '/elsewhere')
+                handler.end_headers()
+            
+            def log_message(handler, *args):
+                pass
+        
+        super().__init__(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+    
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_port}/hook'
+
+
+class WebhookTests(ExpenseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.receiver = WebhookReceiver()
+        self.addCleanup(self.receiver.server_close)
+        self.addCleanup(self.receiver.shutdown)
+    
+    def test_rejects_non_public_urls(self):
+        for url in [
+            'ftp://93.184.216.34/hook',
+            'http://127.0.0.1:8001/',
+            'http://localhost/',
+            'http://10.1.2.3/',
+            'http://169.254.169.254/latest/meta-data/',
+            'http://[::1]/',
+            'http://[::ffff:127.0.0.1]/',
+        ]:
+            response = self.client.post('/api/expenses/webhooks/', {'url': url}, format='json')
+            self.assertEqual(response.status_code, 400, url)
+        response = self.client.post('/api/expenses/webhooks/', {'url': 'https://93.184.216.34/hook'}, format='json')
+        self.assertEqual(response.status_code, 201)
+    
+    @override_settings(WEBHOOK_ALLOW_PRIVATE_ADDRESSES=True)
+    def test_delivers_signed_batches(self):
+        response = self.client.post('/api/expenses/webhooks/', {'url': self.receiver.url}, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        secret = WebhookEndpoint.objects.get().secret
+        expense = self.create_expense()
+        
+        self.assertEqual(dispatch_events(), 1)
+        _, headers, body = self.receiver.requests[0]
+        timestamp, signature = [part.split('=', 1)[1] for part in headers[SIGNATURE_HEADER].split(',')]
+        expected = hmac.new(secret.encode(), f'{timestamp}.'.encode() + body, hashlib.sha256).hexdigest()
+        self.assertEqual(signature, expected)
+        self.assertEqual([event['expense_id'] for event in json.loads(body)['events']], [expense.pk])
+        self.assertEqual(dispatch_events(), 0)
+    
+    def test_delivery_rechecks_the_address(self):
+        endpoint = WebhookEndpoint.objects.create(user=self.user, url=self.receiver.url, secret='secret')
+        self.create_expense()
+        self.assertEqual(dispatch_events(), 0)
+        endpoint.refresh_from_db()
+        self.assertEqual(self.receiver.requests, [])
+        self.assertEqual(endpoint.failure_count, 1)
+        self.assertIn('not a public address', endpoint.last_error)
+    
+    @override_settings(WEBHOOK_ALLOW_PRIVATE_ADDRESSES=True)
+    def test_redirects_are_not_followed(self):
+        self.receiver.status = 302
+        endpoint = WebhookEndpoint.objects.create(user=self.user, url=self.receiver.url, secret='secret')
+        self.create_expense()
+        self.assertEqual(dispatch_events(), 0)
+        endpoint.refresh_from_db()
+        self.assertEqual([path for path, _, _ in self.receiver.requests], ['/hook'])
+        self.assertEqual(endpoint.failure_count, 1)
+        self.assertIsNotNone(endpoint.next_attempt_at)
+
+
+class SnapshotTests(ExpenseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = os.path.join(directory, 'alice.ndjson.gz')
+    
+    def rows(self, user):
+        return sorted(Expense.objects.filter(user=user).values_list('amount_cents', 'category', 'date', 'description'))
+    
+    def test_round_trip(self):
+        self.create_expense(amount='4.00', day=date(2024, 1, 10), description='old')
+        self.create_expense(description='Lunch, "to go"\nwith tip')
+        self.create_expense(amount='800.00', category='bills', day=date(2025, 8, 1), description=None)
+        archive_expenses(date(2025, 1, 1))
+        CategoryRule.objects.create(user=self.user, category='transport', match_type='regex', pattern=r'uber\s*eats?')
+        self.client.get('/api/reports/detail/', {'month': 8, 'year': 2025})
+        
+        call_command('dump_user', 'alice', self.path, stdout=StringIO())
+        output = StringIO()
+        call_command('load_user', self.path, '--username', 'bob', '--email', 'bob@example.com', stdout=output)
+        self.assertIn('Loaded 3 expenses, 1 rules and 1 reports', output.getvalue())
+        
+        bob = User.objects.get(username='bob')
+        self.assertTrue(bob.check_password('testpass123'))
+        self.assertEqual(self.rows(bob), sorted([
+            (400, 'food', date(2024, 1, 10), 'old'),
+            *self.rows(self.user),
+        ]))
+        self.assertEqual(
+            list(CategoryRule.objects.filter(user=bob).values_list('match_type', 'pattern')),
+            [('regex', r'uber\s*eats?')]
+        )
+        self.assertEqual(
+            dict(DailyTotal.objects.filter(user=bob).values_list('date', 'total_cents')),
+            {date(2024, 1, 10): 400, date(2025, 8, 1): 80000, date(2025, 8, 3): 1000}
+        )
+        self.assertEqual(list(Report.objects.filter(user=bob).values_list('year', 'month', 'total_cents')), [
+            (2025, 8, 81000),
+        ])
+        
+        with self.assertRaisesMessage(CommandError, 'User bob already exists.'):
+            call_command('load_user', self.path, '--username', 'bob', stdout=StringIO())
+
+
+class DeferredIndexLoadTests(TransactionTestCase):
+    # The schema editor cannot drop indexes inside the transaction a TestCase wraps around each test
+    
+    def test_indexes_are_rebuilt(self):
+        user = User.objects.create_user('alice', 'alice@example.com', 'testpass123')
+        Expense.objects.create(user=user, amount_cents=250, category='food', date=date(2025, 8, 3))
+        stream = StringIO()
+        dump_user(user, stream)
+        stream.seek(0)
+        
+        bob, loaded = load_user(stream, username='bob', email='bob@example.com', defer_indexes=True)
+        self.assertEqual(loaded['e'], 1)
+        self.assertEqual(list(Expense.objects.filter(user=bob).values_list('amount_cents', flat=True)), [250])
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Expense._meta.db_table)
+        self.assertTrue({index.name for index in Expense._meta.indexes} <= set(constraints))
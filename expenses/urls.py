@@ -1,7 +1,24 @@
-from django.urls import path
-from .views import ExpenseListCreateView, ExpenseDetailView
-
-urlpatterns = [
-    path('', ExpenseListCreateView.as_view(), name='expense-list-create'),
-    path('<int:pk>/', ExpenseDetailView.as_view(), name='expense-detail'),
-]
+from django.urls import path
+from .views import (
+    ExpenseListCreateView, ExpenseDetailView, ExpenseChangesView,
+    ExpenseBulkDeleteView, ExpenseBulkUpdateView, ExpenseAttachmentListView, AttachmentDetailView,
+    AttachmentThumbnailView, ExpenseImportView, CategoryRuleListCreateView, CategoryRuleDetailView,
+    ExpenseEventListView, WebhookEndpointListCreateView, WebhookEndpointDetailView
+)
+
+urlpatterns = [
+    path('', ExpenseListCreateView.as_view(), name='expense-list-create'),
+    path('changes/', ExpenseChangesView.as_view(), name='expense-changes'),
+    path('bulk-delete/', ExpenseBulkDeleteView.as_view(), name='expense-bulk-delete'),
+    path('bulk-update/', ExpenseBulkUpdateView.as_view(), name='expense-bulk-update'),
+    path('import/', ExpenseImportView.as_view(), name='expense-import'),
+    path('rules/', CategoryRuleListCreateView.as_view(), name='category-rule-list-create'),
+    path('rules/<int:pk>/', CategoryRuleDetailView.as_view(), name='category-rule-detail'),
+    path('events/', ExpenseEventListView.as_view(), name='expense-events'),
+    path('webhooks/', WebhookEndpointListCreateView.as_view(), name='webhook-list-create'),
+    path('webhooks/<int:pk>/', WebhookEndpointDetailView.as_view(), name='webhook-detail'),
+    path('<int:pk>/', ExpenseDetailView.as_view(), name='expense-detail'),
+    path('<int:pk>/attachments/', ExpenseAttachmentListView.as_view(), name='expense-attachments'),
+    path('attachments/<int:pk>/', AttachmentDetailView.as_view(), name='attachment-detail'),
+    path('attachments/<int:pk>/thumbnail/', AttachmentThumbnailView.as_view(), name='attachment-thumbnail'),
+]
@@ -0,0 +1,239 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from reports.utils import adjust_daily_totals, get_daily_totals, invalidate_category_stats
+from .attachments import delete_expense_attachments
+from .events import record_deleted_events, record_expense_events
+from .models import Expense, ExpenseTombstone
+from .rules import categorize, get_category_matcher
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The expense was modified by another request.'
+    default_code = 'precondition_failed'
+
+
+def expense_etag(expense):
+    """Build the ETag header value for an expense from its version counter"""
+    return f'"{expense.pk}-{expense.version}"'
+
+
+def parse_if_match(request, expense):
+    """Return the version a client expects from its If-Match header, or None if absent"""
+    header = request.headers.get('If-Match')
+    if header is None:
+        return None
+    
+    tags = [tag.strip() for tag in header.split(',')]
+    if '*' in tags:
+        return None
+    
+    for tag in tags:
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        pk, _, version = tag.strip('"').partition('-')
+        if pk == str(expense.pk) and version.isdigit():
+            return int(version)
+    
+    raise PreconditionFailed()
+
+
+def update_expense_fields(expense, changes, expected_version=None):
+    """Apply changed fields with a single conditional UPDATE guarded by the version counter"""
+    if expected_version is None:
+        expected_version = expense.version
+    
+    now = timezone.now()
+    with transaction.atomic():
+        updated = Expense.objects.filter(
+            pk=expense.pk,
+            version=expected_version
+        ).update(version=F('version') + 1, updated_at=now, **changes)
+        if not updated:
+            raise PreconditionFailed()
+        
+        if 'amount_cents' in changes or 'date' in changes:
+            deltas = {expense.date: -expense.amount_cents}
+            new_date = changes.get('date', expense.date)
+            deltas[new_date] = deltas.get(new_date, 0) + changes.get('amount_cents', expense.amount_cents)
+            adjust_daily_totals(expense.user, deltas)
+        if changes.keys() & {'amount_cents', 'date', 'category'}:
+            new_date = changes.get('date', expense.date)
+            invalidate_category_stats(expense.user, {
+                (expense.date.year, expense.date.month),
+                (new_date.year, new_date.month),
+            })
+        
+        for field, value in changes.items():
+            setattr(expense, field, value)
+        expense.version = expected_version + 1
+        expense.updated_at = now
+        record_expense_events('updated', [expense])
+    return expense
+
+
+def encode_sync_cursor(moment):
+    """Encode a timestamp as an opaque sync cursor (microseconds since the epoch)"""
+    delta = moment - datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+    return str((delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds)
+
+
+def decode_sync_cursor(cursor):
+    """Decode a sync cursor produced by encode_sync_cursor"""
+    if not cursor.isdigit():
+        raise ValidationError({'since': 'Invalid sync cursor.'})
+    try:
+        micros = int(cursor)
+        return datetime.fromtimestamp(micros // 1000000, tz=dt_timezone.utc).replace(
+            microsecond=micros % 1000000
+        )
+    except (ValueError, OverflowError, OSError):
+        raise ValidationError({'since': 'Invalid sync cursor.'})
+
+
+def delete_expenses(user, queryset):
+    """Hard delete the user's expenses in a queryset with set-based statements.
+    
+    Tombstones for sync clients and deleted events are each written with one
+    INSERT ... SELECT. The daily totals are adjusted from a single grouped read
+    taken before the DELETE runs, and the affected monthly reports are marked
+    stale so their totals are recomputed on the next read.
+    Attachments are removed with one DELETE ahead of the expenses.
+    """
+    queryset = queryset.filter(user=user).order_by()
+    with transaction.atomic():
+        daily_totals = get_daily_totals(queryset)
+        if not daily_totals:
+            return 0
+        
+        select_sql, params = queryset.values('user_id', 'pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {ExpenseTombstone._meta.db_table} (user_id, expense_id, deleted_at) '
+                f'SELECT expenses.user_id, expenses.id, %s FROM ({select_sql}) AS expenses',
+                [connection.ops.adapt_datetimefield_value(timezone.now()), *params]
+            )
+        record_deleted_events(queryset)
+        
+        delete_expense_attachments(queryset.values('pk'))
+        deleted, _ = queryset.delete()
+        
+        invalidate_category_stats(user, {(day.year, day.month) for day in daily_totals})
+        adjust_daily_totals(user, {day: -total for day, total in daily_totals.items()})
+    return deleted
+
+
+def filter_expenses(queryset, filters):
+    """Narrow an expense queryset by validated bulk operation filters"""
+    if 'ids' in filters:
+        queryset = queryset.filter(pk__in=filters['ids'])
+    if 'category' in filters:
+        queryset = queryset.filter(category=filters['category'])
+    if 'date_from' in filters:
+        queryset = queryset.filter(date__gte=filters['date_from'])
+    if 'date_to' in filters:
+        queryset = queryset.filter(date__lte=filters['date_to'])
+    return queryset
+
+
+def import_expenses(user, rows, batch_size=1000):
+    """Create many expenses at once, filling in missing categories from the user's rules.
+    
+    The rules are compiled once for the whole import, the rows and their created
+    events are written with bulk_create, and the per-day totals are adjusted
+    with a single call.
+    """
+    matcher = get_category_matcher(user)
+    expenses = []
+    deltas = {}
+    categorized = 0
+    for row in rows:
+        category = row.get('category')
+        if not category:
+            category = categorize(matcher, row.get('description'), row['amount_cents'])
+            categorized += 1
+        expenses.append(Expense(
+            user=user,
+            amount_cents=row['amount_cents'],
+            category=category,
+            date=row['date'],
+            description=row.get('description')
+        ))
+        deltas[row['date']] = deltas.get(row['date'], 0) + row['amount_cents']
+    
+    with transaction.atomic():
+        Expense.objects.bulk_create(expenses, batch_size=batch_size)
+        adjust_daily_totals(user, deltas)
+        invalidate_category_stats(user, {(day.year, day.month) for day in deltas})
+        record_expense_events('created', expenses, batch_size=batch_size)
+    return {'imported': len(expenses), 'categorized': categorized}
+
+
+def update_expenses(user, queryset, changes):
+    """Apply the same field changes to the user's expenses in a queryset with one UPDATE"""
+    now = timezone.now()
+    with transaction.atomic():
+        updated = queryset.filter(user=user).update(version=F('version') + 1, updated_at=now, **changes)
+        if updated:
+            # The UPDATE stamped every changed row with the same updated_at, which the
+            # (user, updated_at) index finds again even when the filter no longer matches
+            changed = Expense.objects.filter(user=user, updated_at=now)
+            if 'category' in changes:
+                invalidate_category_stats(user, (
+                    (day.year, day.month) for day in changed.dates('date', 'month')
+                ))
+            record_expense_events('updated', changed.iterator())
+    return updated
+
+
+def get_expense_changes(user, since=None):
+    """Collect expenses created, updated and deleted for a user after a sync cursor.
+    
+    updated_at is stamped before a write commits, so a slow transaction can
+    commit a timestamp older than a cursor that was already handed out. The
+    returned cursor therefore lags SYNC_CURSOR_LAG seconds behind now, and the
+    next sync returns the changes from that window again.
+    """
+    now = timezone.now()
+    cursor = encode_sync_cursor(now - timedelta(seconds=settings.SYNC_CURSOR_LAG))
+    expenses = Expense.objects.filter(user=user, updated_at__lte=now).select_related('user')
+    
+    if since is None:
+        return {
+            'cursor': cursor,
+            'created': list(expenses.order_by('updated_at')),
+            'updated': [],
+            'deleted': [],
+        }
+    
+    changed = expenses.filter(updated_at__gt=since).order_by('updated_at')
+    deleted = ExpenseTombstone.objects.filter(
+        user=user,
+        deleted_at__gt=since,
+        deleted_at__lte=now
+    ).values_list('expense_id', flat=True)
+    
+    created, updated = [], []
+    for expense in changed:
+        (created if expense.created_at > since else updated).append(expense)
+    
+    return {
+        'cursor': cursor,
+        'created': created,
+        'updated': updated,
+        'deleted': list(deleted),
+    }
+
+
+def sort_expenses(expenses, ordering):
+    """Sort expense instances in Python by Django-style ordering fields such as '-date'"""
+    expenses = list(expenses)
+    for field in reversed(ordering):
+        name = field.lstrip('-')
+        expenses.sort(key=lambda expense: getattr(expense, name), reverse=field.startswith('-'))
+    return expenses
@@ -1,29 +1,335 @@
-from rest_framework import generics, permissions, filters
-from django_filters.rest_framework import DjangoFilterBackend
-from .models import Expense
-from .serializers import ExpenseSerializer, ExpenseCreateSerializer
-
-
-class ExpenseListCreateView(generics.ListCreateAPIView):
-    serializer_class = ExpenseSerializer
-    permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['category', 'date']
-    search_fields = ['description']
-    ordering_fields = ['amount', 'date', 'created_at']
-    
-    def get_queryset(self):
-        return Expense.objects.filter(user=self.request.user)
-    
-    def get_serializer_class(self):
-        if self.request.method == 'POST':
-            return ExpenseCreateSerializer
-        return ExpenseSerializer
-
-
-class ExpenseDetailView(generics.RetrieveUpdateDestroyAPIView):
-    serializer_class = ExpenseSerializer
-    permission_classes = [permissions.IsAuthenticated]
-    
-    def get_queryset(self):
-        return Expense.objects.filter(user=self.request.user)
+import os
+from datetime import date
+from itertools import chain
+from rest_framework import generics, permissions, filters, status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.conf import settings
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
+from django.template.defaultfilters import filesizeformat
+from django_filters.rest_framework import DjangoFilterBackend
+from .archive import get_expense_sources
+from .events import serialize_event, wait_for_events
+from .attachments import (
+    ReceiptUploadHandler, attach_receipt, can_thumbnail, prefetch_attachment_ids, receipt_response,
+    request_thumbnail, thumbnail_failed
+)
+from .models import ArchivedExpense, Attachment, CategoryRule, Expense, WebhookEndpoint
+from .renderers import get_list_renderer_classes
+from .serializers import (
+    AttachmentSerializer, CategoryRuleSerializer, ExpenseSerializer, ExpenseCreateSerializer,
+    ExpenseBulkDeleteSerializer, ExpenseBulkUpdateSerializer, ExpenseEventQuerySerializer, ExpenseImportSerializer,
+    WebhookEndpointSerializer
+)
+from .utils import (
+    PreconditionFailed, decode_sync_cursor, delete_expenses, expense_etag, filter_expenses,
+    get_expense_changes, import_expenses, parse_if_match, sort_expenses,
+    update_expense_fields, update_expenses
+)
+
+
+class AmountOrderingFilter(filters.OrderingFilter):
+    """OrderingFilter that accepts `amount` for the amount_cents column"""
+    
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        fields = [term.replace('amount', 'amount_cents') if term.lstrip('-') == 'amount' else term for term in fields]
+        return super().remove_invalid_fields(queryset, fields, view, request)
+
+
+class ExpenseListCreateView(generics.ListCreateAPIView):
+    serializer_class = ExpenseSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = get_list_renderer_classes()
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, AmountOrderingFilter]
+    filterset_fields = {
+        'category': ['exact'],
+        'date': ['exact', 'gte', 'lte'],
+    }
+    search_fields = ['description']
+    ordering_fields = ['amount_cents', 'date', 'created_at']
+    
+    def get_queryset(self):
+        return Expense.objects.filter(user=self.request.user).select_related('user')
+    
+    def get_serializer_class(self):
+        if self.request.method == 'POST':
+            return ExpenseCreateSerializer
+        return ExpenseSerializer
+    
+    def list(self, request, *args, **kwargs):
+        if self.include_archived():
+            sources = get_expense_sources(request.user, date_from=self.get_date_from())
+        else:
+            sources = [self.get_queryset()]
+        if len(sources) == 1:
+            expenses = self.filter_queryset(self.get_queryset())
+        else:
+            # The requested range reaches into the archive: filter both stores the same way and merge
+            querysets = [self.filter_queryset(source.select_related('user')) for source in sources]
+            ordering = querysets[0].query.order_by or Expense._meta.ordering
+            expenses = sort_expenses(chain.from_iterable(querysets), ordering)
+        
+        # Attachment ids for every row come from one query, whichever store the rows live in
+        serializer = self.get_serializer(prefetch_attachment_ids(expenses), many=True)
+        return Response(serializer.data)
+    
+    def include_archived(self):
+        """Archived expenses are read-only, so the list only merges them in when asked to"""
+        return self.request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes')
+    
+    def get_date_from(self):
+        """Return the earliest date the request's filters can match, or None if unbounded"""
+        params = self.request.query_params
+        value = params.get('date') or params.get('date__gte')
+        try:
+            return date.fromisoformat(value) if value else None
+        except ValueError:
+            return None
+
+
+class ExpenseDetailView(generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = ExpenseSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        return Expense.objects.filter(user=self.request.user).select_related('user')
+    
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data, headers={'ETag': expense_etag(instance)})
+    
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        instance = self.get_object()
+        expected_version = parse_if_match(request, instance)
+        
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        
+        # Only write the columns whose values actually changed
+        changes = {
+            field: value for field, value in serializer.validated_data.items()
+            if getattr(instance, field) != value
+        }
+        if changes:
+            update_expense_fields(instance, changes, expected_version)
+        elif expected_version is not None and expected_version != instance.version:
+            raise PreconditionFailed()
+        
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data, headers={'ETag': expense_etag(instance)})
+    
+    def perform_destroy(self, instance):
+        expected_version = parse_if_match(self.request, instance)
+        queryset = self.get_queryset().filter(pk=instance.pk)
+        if expected_version is not None:
+            queryset = queryset.filter(version=expected_version)
+        
+        if not delete_expenses(self.request.user, queryset):
+            raise PreconditionFailed()
+
+
+class ExpenseChangesView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, *args, **kwargs):
+        since = request.query_params.get('since')
+        if since is not None:
+            since = decode_sync_cursor(since)
+        
+        changes = get_expense_changes(request.user, since)
+        prefetch_attachment_ids(changes['created'] + changes['updated'])
+        return Response({
+            'cursor': changes['cursor'],
+            'created': ExpenseSerializer(changes['created'], many=True).data,
+            'updated': ExpenseSerializer(changes['updated'], many=True).data,
+            'deleted': changes['deleted'],
+        })
+
+
+class ExpenseBulkDeleteView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request, *args, **kwargs):
+        serializer = ExpenseBulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        queryset = filter_expenses(Expense.objects.all(), serializer.validated_data['filter'])
+        deleted = delete_expenses(request.user, queryset)
+        return Response({'deleted': deleted})
+
+
+class ExpenseBulkUpdateView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request, *args, **kwargs):
+        serializer = ExpenseBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        queryset = filter_expenses(Expense.objects.all(), serializer.validated_data['filter'])
+        updated = update_expenses(request.user, queryset, serializer.validated_data['update'])
+        return Response({'updated': updated})
+
+
+class ExpenseEventListView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, *args, **kwargs):
+        query = ExpenseEventQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        after = query.validated_data['after']
+        
+        # With wait, hold the request open until an event arrives instead of making clients poll
+        events = wait_for_events(request.user, after, query.validated_data['limit'], query.validated_data['wait'])
+        return Response({
+            'events': [serialize_event(event) for event in events],
+            'cursor': events[-1].pk if events else after,
+        })
+
+
+class WebhookEndpointListCreateView(generics.ListCreateAPIView):
+    serializer_class = WebhookEndpointSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        return WebhookEndpoint.objects.filter(user=self.request.user)
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        endpoint = serializer.save()
+        # The signing secret is only ever shown once, when the endpoint is created
+        return Response(dict(serializer.data, secret=endpoint.secret), status=status.HTTP_201_CREATED)
+
+
+class WebhookEndpointDetailView(generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = WebhookEndpointSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        return WebhookEndpoint.objects.filter(user=self.request.user)
+
+
+class ExpenseImportView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request, *args, **kwargs):
+        serializer = ExpenseImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        result = import_expenses(request.user, serializer.validated_data['expenses'])
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+class CategoryRuleListCreateView(generics.ListCreateAPIView):
+    serializer_class = CategoryRuleSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        return CategoryRule.objects.filter(user=self.request.user)
+
+
+class CategoryRuleDetailView(generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = CategoryRuleSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        return CategoryRule.objects.filter(user=self.request.user)
+
+
+class ExpenseAttachmentListView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def initialize_request(self, request, *args, **kwargs):
+        # Stream uploads to disk in chunks instead of Django's memory/temp file handlers
+        self.upload_handler = ReceiptUploadHandler(request)
+        request.upload_handlers = [self.upload_handler]
+        return super().initialize_request(request, *args, **kwargs)
+    
+    def get_expense_id(self):
+        """Return the expense id after checking it belongs to the user, live or archived"""
+        expense_id = self.kwargs['pk']
+        user = self.request.user
+        if not (
+            Expense.objects.filter(pk=expense_id, user=user).exists()
+            or ArchivedExpense.objects.filter(pk=expense_id, user=user).exists()
+        ):
+            raise NotFound()
+        return expense_id
+    
+    def get(self, request, *args, **kwargs):
+        attachments = Attachment.objects.filter(
+            expense_id=self.get_expense_id(),
+            user=request.user
+        ).select_related('blob')
+        return Response(AttachmentSerializer(attachments, many=True).data)
+    
+    def post(self, request, *args, **kwargs):
+        expense = get_object_or_404(Expense, pk=kwargs['pk'], user=request.user)
+        uploads = list(request.FILES.values())
+        try:
+            if self.upload_handler.too_large:
+                limit = filesizeformat(settings.RECEIPT_MAX_UPLOAD_SIZE)
+                raise ValidationError({'file': f'Receipts are limited to {limit}.'})
+            upload = request.FILES.get('file')
+            if upload is None:
+                raise ValidationError({'file': 'No file was submitted.'})
+            if upload.content_type is None:
+                raise ValidationError({'file': 'Only JPEG, PNG, GIF, WebP and PDF receipts are supported.'})
+            
+            attachment = attach_receipt(expense, request.user, upload)
+            uploads.remove(upload)
+        finally:
+            for unused in uploads:
+                unused.close()
+                os.remove(unused.temporary_file_path())
+        
+        return Response(AttachmentSerializer(attachment).data, status=status.HTTP_201_CREATED)
+
+
+class AttachmentDetailView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_object(self):
+        return get_object_or_404(
+            Attachment.objects.select_related('blob'),
+            pk=self.kwargs['pk'],
+            user=self.request.user
+        )
+    
+    def get(self, request, *args, **kwargs):
+        return receipt_response(request, self.get_object())
+    
+    def delete(self, request, *args, **kwargs):
+        self.get_object().delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AttachmentThumbnailView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, *args, **kwargs):
+        attachment = get_object_or_404(
+            Attachment.objects.select_related('blob'),
+            pk=kwargs['pk'],
+            user=request.user
+        )
+        if not can_thumbnail(attachment.blob):
+            raise NotFound('No thumbnail is available for this attachment.')
+        if thumbnail_failed(attachment.blob):
+            return Response(
+                {'detail': 'The receipt image could not be read.'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        
+        path = request_thumbnail(attachment.blob)
+        if path is None:
+            # Rendering happens in the background; clients retry shortly
+            return Response(status=status.HTTP_202_ACCEPTED, headers={'Retry-After': '1'})
+        
+        response = FileResponse(open(path, 'rb'), content_type='image/jpeg')
+        response['Cache-Control'] = 'private, max-age=31536000, immutable'
+        return response
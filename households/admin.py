@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import Household, HouseholdMembership
+
+
+class HouseholdMembershipInline(admin.TabularInline):
+    model = HouseholdMembership
+    autocomplete_fields = ['user']
+    extra = 0
+
+
+@admin.register(Household)
+class HouseholdAdmin(admin.ModelAdmin):
+    list_display = ['name', 'created_by', 'created_at']
+    search_fields = ['name', '=created_by__username']
+    autocomplete_fields = ['created_by']
+    list_select_related = ['created_by']
+    inlines = [HouseholdMembershipInline]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('households', '0001_initial'),
+    ]
+
+    operations = [
+        # Existing members joined before invitations existed, so they are active
+        migrations.AddField(
+            model_name='householdmembership',
+            name='status',
+            field=models.CharField(choices=[('invited', 'Invited'), ('active', 'Active')], default='active', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='householdmembership',
+            name='status',
+            field=models.CharField(choices=[('invited', 'Invited'), ('active', 'Active')], default='invited', max_length=10),
+        ),
+    ]
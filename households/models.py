@@ -0,0 +1,45 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class Household(models.Model):
+    """A shared ledger whose members can see each other's spending"""
+    name = models.CharField(max_length=100)
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_households')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+
+class HouseholdMembership(models.Model):
+    """A user's place in a household; an added user is only invited until they accept"""
+    ROLE_CHOICES = [
+        ('owner', 'Owner'),
+        ('member', 'Member'),
+    ]
+    STATUS_CHOICES = [
+        ('invited', 'Invited'),
+        ('active', 'Active'),
+    ]
+    
+    household = models.ForeignKey(Household, on_delete=models.CASCADE, related_name='memberships')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='household_memberships')
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='member')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='invited')
+    joined_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['household', 'user']
+        ordering = ['joined_at']
+        indexes = [
+            models.Index(fields=['user', 'household'], name='membership_user_household_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.household.name} ({self.role}, {self.status})"
@@ -0,0 +1,18 @@
+from rest_framework import permissions
+from .utils import get_household_access
+
+
+class IsHouseholdMember(permissions.BasePermission):
+    """Allow access to a household's endpoints only to its members"""
+    
+    def has_permission(self, request, view):
+        get_household_access(request, view.kwargs['pk'])
+        return True
+
+
+class IsHouseholdOwner(permissions.BasePermission):
+    """Allow changes to a household's memberships only to its owners"""
+    message = 'Only household owners can manage members.'
+    
+    def has_permission(self, request, view):
+        return get_household_access(request, view.kwargs['pk'])['role'] == 'owner'
@@ -0,0 +1,26 @@
+from django.contrib.auth import get_user_model
+from rest_framework import serializers
+from .models import Household, HouseholdMembership
+
+User = get_user_model()
+
+
+class HouseholdSerializer(serializers.ModelSerializer):
+    created_by = serializers.ReadOnlyField(source='created_by.username')
+    membership_status = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = Household
+        fields = ['id', 'name', 'created_by', 'created_at', 'membership_status']
+        read_only_fields = ['id', 'created_by', 'created_at']
+
+
+class HouseholdMemberAddSerializer(serializers.Serializer):
+    username = serializers.CharField()
+    role = serializers.ChoiceField(choices=HouseholdMembership.ROLE_CHOICES, default='member')
+    
+    def validate_username(self, value):
+        try:
+            return User.objects.get(username=value)
+        except User.DoesNotExist:
+            raise serializers.ValidationError('No user with this username.')
@@ -0,0 +1,88 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+from expenses.models import Expense
+
+User = get_user_model()
+
+
+class HouseholdTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'testpass123')
+        self.invitee = User.objects.create_user('invitee', 'invitee@example.com', 'testpass123')
+        self.stranger = User.objects.create_user('stranger', 'stranger@example.com', 'testpass123')
+        for user, cents in [(self.owner, 1000), (self.invitee, 750), (self.stranger, 9900)]:
+            Expense.objects.create(user=user, amount_cents=cents, category='food', date=date(2025, 8, 5))
+        
+        response = self.client_for(self.owner).post('/api/households/', {'name': 'Home'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['membership_status'], 'active')
+        self.household_id = response.data['id']
+    
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+    
+    def url(self, suffix=''):
+        return f'/api/households/{self.household_id}/{suffix}'
+    
+    def invite(self, username='invitee', role='member'):
+        return self.client_for(self.owner).post(self.url('members/'), {'username': username, 'role': role}, format='json')
+    
+    def report_total(self, user):
+        response = self.client_for(user).get(self.url('report/'), {'month': 8, 'year': 2025})
+        self.assertEqual(response.status_code, 200)
+        return response.data['total_amount']
+    
+    def test_non_members_get_404(self):
+        stranger = self.client_for(self.stranger)
+        for suffix in ['', 'report/']:
+            self.assertEqual(stranger.get(self.url(suffix)).status_code, 404)
+        self.assertEqual(stranger.post(self.url('members/'), {'username': 'stranger'}).status_code, 404)
+    
+    def test_invited_users_are_left_out_until_they_accept(self):
+        response = self.invite()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual({member['username']: member['status'] for member in response.data}, {
+            'owner': 'active',
+            'invitee': 'invited',
+        })
+        self.assertEqual(self.invite().status_code, 400)
+        self.assertEqual(self.report_total(self.owner), 10.0)
+        
+        invitee = self.client_for(self.invitee)
+        self.assertEqual(invitee.get(self.url('report/')).status_code, 404)
+        self.assertEqual([household['membership_status'] for household in invitee.get('/api/households/').data], ['invited'])
+        
+        self.assertEqual(self.client_for(self.stranger).post(self.url('invitation/')).status_code, 404)
+        self.assertEqual(invitee.post(self.url('invitation/')).status_code, 200)
+        self.assertEqual(invitee.post(self.url('invitation/')).status_code, 404)
+        self.assertEqual(self.report_total(self.owner), 17.5)
+        self.assertEqual(self.report_total(self.invitee), 17.5)
+    
+    def test_declining_an_invitation(self):
+        self.invite()
+        invitee = self.client_for(self.invitee)
+        self.assertEqual(invitee.delete(self.url('invitation/')).status_code, 204)
+        self.assertEqual(invitee.get('/api/households/').data, [])
+        self.assertEqual(self.invite().status_code, 201)
+    
+    def test_only_owners_manage_members(self):
+        self.invite()
+        invitee = self.client_for(self.invitee)
+        invitee.post(self.url('invitation/'))
+        
+        self.assertEqual(invitee.post(self.url('members/'), {'username': 'stranger'}).status_code, 403)
+        self.assertEqual(invitee.delete(self.url(f'members/{self.owner.pk}/')).status_code, 403)
+        self.assertEqual(self.client_for(self.owner).delete(self.url(f'members/{self.owner.pk}/')).status_code, 400)
+        
+        self.assertEqual(invitee.delete(self.url(f'members/{self.invitee.pk}/')).status_code, 204)
+        self.assertEqual(invitee.get(self.url()).status_code, 404)
+    
+    def test_invited_owner_does_not_count_as_an_owner(self):
+        self.invite(role='owner')
+        response = self.client_for(self.owner).delete(self.url(f'members/{self.owner.pk}/'))
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,14 @@
+from django.urls import path
+from .views import (
+    HouseholdListCreateView, HouseholdDetailView, HouseholdMemberListView,
+    HouseholdMemberDetailView, HouseholdInvitationView, HouseholdReportView
+)
+
+urlpatterns = [
+    path('', HouseholdListCreateView.as_view(), name='household-list-create'),
+    path('<int:pk>/', HouseholdDetailView.as_view(), name='household-detail'),
+    path('<int:pk>/members/', HouseholdMemberListView.as_view(), name='household-members'),
+    path('<int:pk>/members/<int:user_id>/', HouseholdMemberDetailView.as_view(), name='household-member-detail'),
+    path('<int:pk>/invitation/', HouseholdInvitationView.as_view(), name='household-invitation'),
+    path('<int:pk>/report/', HouseholdReportView.as_view(), name='household-report'),
+]
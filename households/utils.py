@@ -0,0 +1,105 @@
+from django.db.models import Count, Sum
+from django.http import Http404
+from expenses.archive import get_member_expense_sources
+from expenses.money import cents_to_number
+from reports.utils import format_category_summary, get_month_range
+from .models import HouseholdMembership
+
+
+def get_household_access(request, household_id):
+    """Resolve the requesting user's access to a household once per request.
+    
+    A single query loads the household's members, invited ones included. The
+    result is cached on the request, so permission checks and the view reuse
+    it. Raises Http404 unless the user is an active member, so other
+    households' existence is not leaked and invited users see nothing before
+    they accept.
+    """
+    cache = getattr(request, '_household_access', None)
+    if cache is None:
+        cache = request._household_access = {}
+    
+    household_id = int(household_id)
+    if household_id not in cache:
+        rows = HouseholdMembership.objects.filter(household_id=household_id).values_list(
+            'user_id', 'user__username', 'role', 'status', 'household__name', 'household__created_at'
+        )
+        members = [{'user_id': row[0], 'username': row[1], 'role': row[2], 'status': row[3]} for row in rows]
+        role = next((
+            member['role'] for member in members
+            if member['user_id'] == request.user.pk and member['status'] == 'active'
+        ), None)
+        cache[household_id] = {
+            'id': household_id,
+            'name': rows[0][4] if role else None,
+            'created_at': rows[0][5] if role else None,
+            'role': role,
+            'members': members,
+        }
+    
+    access = cache[household_id]
+    if access['role'] is None:
+        raise Http404('No Household matches the given query.')
+    return access
+
+
+def forget_household_access(request, household_id):
+    """Drop a cached access entry after the household's memberships change"""
+    getattr(request, '_household_access', {}).pop(int(household_id), None)
+
+
+def generate_household_report(members, month, year):
+    """Aggregate a month of spending across household members with one grouped query per store.
+    
+    Only active members count; invited users' spending stays private until they accept.
+    """
+    members = [member for member in members if member['status'] == 'active']
+    start, end = get_month_range(month, year)
+    user_ids = [member['user_id'] for member in members]
+    
+    totals = {}
+    for expenses in get_member_expense_sources(user_ids, date_from=start):
+        rows = expenses.filter(date__gte=start, date__lt=end).values('user_id', 'category').annotate(
+            total_cents=Sum('amount_cents'),
+            count=Count('id')
+        ).order_by()
+        for row in rows:
+            key = (row['user_id'], row['category'])
+            total, count = totals.get(key, (0, 0))
+            totals[key] = (total + row['total_cents'], count + row['count'])
+    
+    by_member = {
+        member['user_id']: {
+            'user_id': member['user_id'],
+            'username': member['username'],
+            'total_cents': 0,
+            'count': 0,
+        }
+        for member in members
+    }
+    by_category = {}
+    for (user_id, category), (total, count) in totals.items():
+        by_member[user_id]['total_cents'] += total
+        by_member[user_id]['count'] += count
+        entry = by_category.setdefault(category, {'category': category, 'total_cents': 0, 'count': 0})
+        entry['total_cents'] += total
+        entry['count'] += count
+    
+    members = sorted(by_member.values(), key=lambda entry: entry['total_cents'], reverse=True)
+    return {
+        'month': month,
+        'year': year,
+        'total_amount': cents_to_number(sum(entry['total_cents'] for entry in members)),
+        'members': [
+            {
+                'user_id': entry['user_id'],
+                'username': entry['username'],
+                'total': cents_to_number(entry['total_cents']),
+                'count': entry['count'],
+            }
+            for entry in members
+        ],
+        'category_summary': format_category_summary(
+            sorted(by_category.values(), key=lambda entry: entry['total_cents'], reverse=True)
+        ),
+    }
@@ -0,0 +1,134 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from expense_tracker.routers import ReplicaReadMixin
+from reports.serializers import ReportQuerySerializer
+from .models import Household, HouseholdMembership
+from .permissions import IsHouseholdMember, IsHouseholdOwner
+from .serializers import HouseholdSerializer, HouseholdMemberAddSerializer
+from .utils import forget_household_access, generate_household_report, get_household_access
+
+
+class HouseholdListCreateView(generics.ListCreateAPIView):
+    serializer_class = HouseholdSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        # Invitations are listed too, so invited users can find the household to accept
+        return Household.objects.filter(memberships__user=self.request.user).annotate(
+            membership_status=F('memberships__status')
+        ).select_related('created_by')
+    
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            household = serializer.save(created_by=self.request.user)
+            HouseholdMembership.objects.create(
+                household=household,
+                user=self.request.user,
+                role='owner',
+                status='active'
+            )
+        household.membership_status = 'active'
+
+
+class HouseholdDetailView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsHouseholdMember]
+    
+    def get(self, request, pk, *args, **kwargs):
+        access = get_household_access(request, pk)
+        return Response({
+            'id': access['id'],
+            'name': access['name'],
+            'created_at': access['created_at'],
+            'members': access['members'],
+        })
+
+
+class HouseholdMemberListView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsHouseholdMember, IsHouseholdOwner]
+    
+    def post(self, request, pk, *args, **kwargs):
+        serializer = HouseholdMemberAddSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            with transaction.atomic():
+                HouseholdMembership.objects.create(
+                    household_id=pk,
+                    user=serializer.validated_data['username'],
+                    role=serializer.validated_data['role']
+                )
+        except IntegrityError:
+            raise ValidationError({'username': 'This user is already a member or invited.'})
+        
+        forget_household_access(request, pk)
+        return Response(get_household_access(request, pk)['members'], status=status.HTTP_201_CREATED)
+
+
+class HouseholdMemberDetailView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsHouseholdMember]
+    
+    def delete(self, request, pk, user_id, *args, **kwargs):
+        access = get_household_access(request, pk)
+        
+        # Owners manage everyone; members may only leave
+        if access['role'] != 'owner' and user_id != request.user.pk:
+            self.permission_denied(request, message=IsHouseholdOwner.message)
+        if user_id == request.user.pk and access['role'] == 'owner':
+            owners = [
+                member for member in access['members']
+                if member['role'] == 'owner' and member['status'] == 'active'
+            ]
+            if len(owners) == 1:
+                raise ValidationError('The last owner cannot leave the household.')
+        
+        deleted, _ = HouseholdMembership.objects.filter(household_id=pk, user_id=user_id).delete()
+        if not deleted:
+            raise NotFound('This user is not a member.')
+        
+        forget_household_access(request, pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class HouseholdInvitationView(APIView):
+    """Accept (POST) or decline (DELETE) the requesting user's invitation to a household"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_invitation(self, request, pk):
+        return HouseholdMembership.objects.filter(household_id=pk, user=request.user, status='invited')
+    
+    def post(self, request, pk, *args, **kwargs):
+        accepted = self.get_invitation(request, pk).update(status='active', joined_at=timezone.now())
+        if not accepted:
+            raise NotFound('No pending invitation to this household.')
+        
+        access = get_household_access(request, pk)
+        return Response({
+            'id': access['id'],
+            'name': access['name'],
+            'created_at': access['created_at'],
+            'members': access['members'],
+        })
+    
+    def delete(self, request, pk, *args, **kwargs):
+        deleted, _ = self.get_invitation(request, pk).delete()
+        if not deleted:
+            raise NotFound('No pending invitation to this household.')
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class HouseholdReportView(ReplicaReadMixin, APIView):
+    permission_classes = [permissions.IsAuthenticated, IsHouseholdMember]
+    
+    def get(self, request, pk, *args, **kwargs):
+        query = ReportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        month = query.validated_data.get('month', timezone.now().month)
+        year = query.validated_data.get('year', timezone.now().year)
+        
+        report = generate_household_report(get_household_access(request, pk)['members'], month, year)
+        return Response({'household': int(pk), **report})
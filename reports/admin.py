@@ -1,10 +1,26 @@
-from django.contrib import admin
-from .models import Report
-
-
-@admin.register(Report)
-class ReportAdmin(admin.ModelAdmin):
-    list_display = ['user', 'month', 'year', 'total_amount', 'created_at']
-    list_filter = ['year', 'month', 'created_at']
-    search_fields = ['user__username']
-    ordering = ['-year', '-month']
+from django.contrib import admin
+from expense_tracker.admin_utils import LargeTableAdmin
+from .models import Report
+
+
+class MonthListFilter(admin.SimpleListFilter):
+    """Fixed month choices, so the filter does not run SELECT DISTINCT month"""
+    title = 'month'
+    parameter_name = 'month'
+    
+    def lookups(self, request, model_admin):
+        return [(str(month), str(month)) for month in range(1, 13)]
+    
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(month=self.value())
+        return queryset
+
+
+@admin.register(Report)
+class ReportAdmin(LargeTableAdmin):
+    list_display = ['user', 'month', 'year', 'total_amount', 'created_at']
+    list_filter = ['year', MonthListFilter, 'created_at']
+    search_fields = ['=user__username']
+    autocomplete_fields = ['user']
+    ordering = ['-year', '-month']
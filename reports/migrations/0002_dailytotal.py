@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:35
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+import django.db.models.deletion
+
+
+def backfill_daily_totals(apps, schema_editor):
+    Expense = apps.get_model('expenses', 'Expense')
+    ArchivedExpense = apps.get_model('expenses', 'ArchivedExpense')
+    DailyTotal = apps.get_model('reports', 'DailyTotal')
+    
+    totals = {}
+    for model in (Expense, ArchivedExpense):
+        rows = model.objects.order_by().values('user_id', 'date').annotate(total=Sum('amount'))
+        for row in rows:
+            key = (row['user_id'], row['date'])
+            totals[key] = totals.get(key, 0) + int(row['total'] * 100)
+    
+    DailyTotal.objects.bulk_create(
+        (DailyTotal(user_id=user_id, date=day, total_cents=cents) for (user_id, day), cents in totals.items()),
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expenses', '0004_archivedexpense'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_cents', models.BigIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_totals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_dailytotal'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['-year', '-month'], name='report_year_month_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:10
+
+from django.db import migrations, models
+from django.db.models import BigIntegerField, DecimalField, ExpressionWrapper, F, Value
+from django.db.models.functions import Cast, Round
+
+
+def totals_to_cents(apps, schema_editor):
+    Report = apps.get_model('reports', 'Report')
+    Report.objects.update(total_cents=Cast(Round(F('total_amount') * 100), BigIntegerField()))
+
+
+def cents_to_totals(apps, schema_editor):
+    Report = apps.get_model('reports', 'Report')
+    Report.objects.update(total_amount=ExpressionWrapper(
+        F('total_cents') / Value(100.0),
+        output_field=DecimalField(max_digits=12, decimal_places=2)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_report_year_month_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='total_cents',
+            field=models.BigIntegerField(null=True),
+        ),
+        # Nullable while the data moves, so the migration can also be reversed
+        migrations.AlterField(
+            model_name='report',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.RunPython(totals_to_cents, cents_to_totals),
+        migrations.RemoveField(
+            model_name='report',
+            name='total_amount',
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='total_cents',
+            field=models.BigIntegerField(),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_report_total_cents'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='category_stats',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='stats_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
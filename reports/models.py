@@ -1,19 +1,48 @@
-from django.db import models
-from django.contrib.auth import get_user_model
-
-User = get_user_model()
-
-
-class Report(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reports')
-    month = models.IntegerField()
-    year = models.IntegerField()
-    total_amount = models.DecimalField(max_digits=12, decimal_places=2)
-    created_at = models.DateTimeField(auto_now_add=True)
-    
-    class Meta:
-        unique_together = ['user', 'month', 'year']
-        ordering = ['-year', '-month']
-    
-    def __str__(self):
-        return f"{self.user.username} - {self.month}/{self.year} - ${self.total_amount}"
+from django.db import models
+from django.contrib.auth import get_user_model
+from expenses.money import cents_to_decimal, to_cents
+
+User = get_user_model()
+
+
+class Report(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reports')
+    month = models.IntegerField()
+    year = models.IntegerField()
+    total_cents = models.BigIntegerField()
+    # Per-category totals and distribution stats; null until computed and after the month's expenses change
+    category_stats = models.JSONField(null=True, blank=True)
+    stats_version = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['user', 'month', 'year']
+        ordering = ['-year', '-month']
+        indexes = [
+            models.Index(fields=['-year', '-month'], name='report_year_month_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.month}/{self.year} - ${self.total_amount}"
+    
+    @property
+    def total_amount(self):
+        return cents_to_decimal(self.total_cents)
+    
+    @total_amount.setter
+    def total_amount(self, value):
+        self.total_cents = to_cents(value)
+
+
+class DailyTotal(models.Model):
+    """Per-user spending per day in integer cents, kept up to date on expense writes"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_totals')
+    date = models.DateField()
+    total_cents = models.BigIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['user', 'date']
+        ordering = ['date']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.date} - {self.total_cents}c"
@@ -0,0 +1,6 @@
+from rest_framework import serializers
+
+
+class ReportQuerySerializer(serializers.Serializer):
+    month = serializers.IntegerField(min_value=1, max_value=12, required=False)
+    year = serializers.IntegerField(min_value=1, max_value=9998, required=False)
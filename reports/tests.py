@@ -0,0 +1,159 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+from expense_tracker.routers import PrimaryReplicaRouter, ReplicaReadMixin, _state, is_pinned_to_primary
+from expenses.models import Expense
+from .models import DailyTotal, Report
+from .utils import MonthlyReport, adjust_daily_totals
+
+User = get_user_model()
+
+
+class ReplicaProbeView(ReplicaReadMixin, APIView):
+    """Reports which database a read would be routed to"""
+    
+    def get(self, request):
+        return Response({'alias': PrimaryReplicaRouter().db_for_read(Report)})
+    
+    def post(self, request):
+        return self.get(request)
+
+
+# The replica alias points at the test database, so routed reads still work
+@override_settings(REPLICA_DATABASE_ALIAS='default')
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.addCleanup(vars(_state).clear)
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def probe(self, method='get'):
+        request = getattr(APIRequestFactory(), method)('/probe/')
+        force_authenticate(request, self.user)
+        # Start from the state ReplicaRoutingMiddleware leaves at the start of a request
+        _state.use_replica, _state.wrote = False, False
+        return ReplicaProbeView.as_view()(request).data['alias']
+    
+    def test_router(self):
+        router = PrimaryReplicaRouter()
+        _state.use_replica, _state.wrote = True, False
+        self.assertEqual(router.db_for_read(Report), 'default')
+        self.assertEqual(router.db_for_write(Report), 'default')
+        self.assertIsNone(router.db_for_read(Report))
+    
+    def test_only_safe_requests_read_from_the_replica(self):
+        self.assertEqual(self.probe(), 'default')
+        self.assertIsNone(self.probe('post'))
+        
+        with override_settings(REPLICA_DATABASE_ALIAS='missing'):
+            self.assertIsNone(self.probe())
+    
+    def test_writes_pin_the_user_to_the_primary(self):
+        self.assertEqual(self.client.get('/api/reports/').status_code, 200)
+        self.assertFalse(is_pinned_to_primary(self.user))
+        
+        response = self.client.post('/api/expenses/', {
+            'amount': '10.00',
+            'category': 'food',
+            'date': date(2025, 8, 3).isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(is_pinned_to_primary(self.user))
+        self.assertIsNone(self.probe())
+        
+        cache.clear()
+        self.assertEqual(self.probe(), 'default')
+
+
+class DailyTotalTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'testpass123')
+    
+    def totals(self):
+        return dict(DailyTotal.objects.filter(user=self.user).values_list('date', 'total_cents'))
+    
+    def test_adjust_creates_and_accumulates(self):
+        adjust_daily_totals(self.user, {date(2024, 1, 1): 500, date(2024, 1, 2): 0})
+        adjust_daily_totals(self.user, {date(2024, 1, 1): 700, date(2024, 1, 3): -100})
+        self.assertEqual(self.totals(), {date(2024, 1, 1): 1200, date(2024, 1, 3): -100})
+    
+    def test_calendar(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        Expense.objects.create(user=self.user, amount_cents=1025, category='food', date=date(2024, 1, 1))
+        Expense.objects.create(user=self.user, amount_cents=300, category='food', date=date(2024, 12, 31))
+        
+        days = client.get('/api/reports/calendar/', {'year': 2024}).data['days']
+        self.assertEqual(len(days), 366)
+        self.assertEqual((days[0], days[365], sum(days)), (1025, 300, 1325))
+        self.assertEqual(client.get('/api/reports/calendar/', {'year': 'x'}).status_code, 400)
+
+
+class MonthlyReportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def report(self, month=3, year=2025):
+        response = self.client.get('/api/reports/detail/', {'month': month, 'year': year})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+    
+    def test_totals_and_stats_are_numbers(self):
+        for cents in [100, 200, 300, 400, 1000]:
+            Expense.objects.create(user=self.user, amount_cents=cents, category='food', date=date(2025, 3, 2))
+        report = self.report()
+        self.assertEqual(report['total_amount'], 20.0)
+        self.assertEqual(report['category_summary'], [
+            {'category': 'food', 'total': 20.0, 'count': 5, 'median': 3.0, 'p90': 7.6, 'largest': 10.0},
+        ])
+    
+    def test_stored_stats_follow_orm_writes(self):
+        expense = Expense.objects.create(user=self.user, amount_cents=400, category='food', date=date(2025, 3, 2))
+        self.assertEqual(self.report()['total_amount'], 4.0)
+        self.assertIsNotNone(Report.objects.get(user=self.user).category_stats)
+        
+        expense.category = 'bills'
+        expense.amount_cents = 600
+        expense.save()
+        self.assertIsNone(Report.objects.get(user=self.user).category_stats)
+        report = self.report()
+        self.assertEqual(report['total_amount'], 6.0)
+        self.assertEqual([entry['category'] for entry in report['category_summary']], ['bills'])
+        
+        Expense.objects.create(user=self.user, amount_cents=100, category='food', date=date(2025, 3, 9))
+        self.assertEqual(self.report()['total_amount'], 7.0)
+        expense.delete()
+        self.assertEqual(self.report()['total_amount'], 1.0)
+    
+    def test_invalid_month(self):
+        self.assertEqual(self.client.get('/api/reports/detail/', {'month': 13}).status_code, 400)
+    
+    def test_first_save_includes_writes_made_while_reading(self):
+        Expense.objects.create(user=self.user, amount_cents=400, category='food', date=date(2025, 3, 2))
+        monthly_report = MonthlyReport(self.user, 3, 2025)
+        self.assertEqual(monthly_report.total_cents, 400)
+        
+        Expense.objects.create(user=self.user, amount_cents=100, category='bills', date=date(2025, 3, 9))
+        report = monthly_report.save()
+        self.assertEqual(report.total_cents, 500)
+        stored = Report.objects.get(user=self.user)
+        self.assertEqual((stored.total_cents, len(stored.category_stats)), (500, 2))
+    
+    def test_concurrently_created_report(self):
+        monthly_report = MonthlyReport(self.user, 3, 2025)
+        self.assertEqual(monthly_report.total_cents, 0)
+        MonthlyReport(self.user, 3, 2025).save()
+        Expense.objects.create(user=self.user, amount_cents=700, category='food', date=date(2025, 3, 2))
+        
+        self.assertEqual(monthly_report.save().total_cents, 700)
+        self.assertEqual(Report.objects.get(user=self.user).total_cents, 700)
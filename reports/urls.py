@@ -1,7 +1,8 @@
-from django.urls import path
-from .views import ReportListView, ReportDetailView
-
-urlpatterns = [
-    path('', ReportListView.as_view(), name='report-list'),
-    path('detail/', ReportDetailView.as_view(), name='report-detail'),
-]
+from django.urls import path
+from .views import ReportListView, ReportDetailView, SpendingCalendarView
+
+urlpatterns = [
+    path('', ReportListView.as_view(), name='report-list'),
+    path('detail/', ReportDetailView.as_view(), name='report-detail'),
+    path('calendar/', SpendingCalendarView.as_view(), name='report-calendar'),
+]
@@ -1,55 +1,239 @@
-from decimal import Decimal
-from django.db.models import Sum, Count
-from django.utils import timezone
-from expenses.models import Expense
-from .models import Report
-
-
-def generate_monthly_report(user, month=None, year=None):
-    """Generate or update monthly report for a user"""
-    if month is None:
-        month = timezone.now().month
-    if year is None:
-        year = timezone.now().year
-    
-    # Calculate total expenses for the month
-    total_amount = Expense.objects.filter(
-        user=user,
-        date__month=month,
-        date__year=year
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-    
-    # Create or update report
-    report, created = Report.objects.update_or_create(
-        user=user,
-        month=month,
-        year=year,
-        defaults={'total_amount': total_amount}
-    )
-    
-    return report
-
-
-def get_user_reports(user, year=None):
-    """Get all reports for a user, optionally filtered by year"""
-    queryset = Report.objects.filter(user=user)
-    if year:
-        queryset = queryset.filter(year=year)
-    return queryset.order_by('-year', '-month')
-
-
-def get_category_summary(user, month=None, year=None):
-    """Get expense summary by category for a specific month"""
-    if month is None:
-        month = timezone.now().month
-    if year is None:
-        year = timezone.now().year
-    
-    return Expense.objects.filter(
-        user=user,
-        date__month=month,
-        date__year=year
-    ).values('category').annotate(
-        total=Sum('amount'),
-        count=Count('id')
-    ).order_by('-total')
+from array import array
+from datetime import date
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q, Subquery, Sum
+from django.utils import timezone
+from django.utils.functional import cached_property
+from expenses.models import ArchivedExpense, ArchiveWatermark, Expense
+from expenses.money import cents_to_number
+from .models import DailyTotal, Report
+
+
+def get_month_range(month, year):
+    """Return the [start, end) dates of a month so lookups can use the date index"""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def percentile_cents(amounts, fraction):
+    """Interpolated percentile of a sorted array of cents, rounded to a whole cent"""
+    position = (len(amounts) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(amounts) - 1)
+    return round(amounts[lower] + (amounts[upper] - amounts[lower]) * (position - lower))
+
+
+def compute_category_stats(amounts_by_category):
+    """Build the category summary with distribution stats from arrays of cents per category"""
+    entries = []
+    for category, amounts in amounts_by_category.items():
+        amounts = sorted(amounts)
+        entries.append({
+            'category': category,
+            'total_cents': sum(amounts),
+            'count': len(amounts),
+            'median_cents': percentile_cents(amounts, 0.5),
+            'p90_cents': percentile_cents(amounts, 0.9),
+            'max_cents': amounts[-1],
+        })
+    return sorted(entries, key=lambda entry: entry['total_cents'], reverse=True)
+
+
+class MonthlyReport:
+    """A user's spending for one month, computed once and shared by everything that needs it.
+    
+    The category breakdown with its distribution stats is stored on the report
+    row and served from there until one of the month's expenses changes, so a
+    repeat read is a single row lookup. When the stored stats are missing or
+    stale, the month's amounts are fetched as one compact array per category
+    and the stats are recomputed; save() writes them back. The total is derived
+    from the category sums. All amounts are integer cents.
+    """
+    
+    def __init__(self, user, month=None, year=None):
+        now = timezone.now()
+        self.user = user
+        self.month = month if month is not None else now.month
+        self.year = year if year is not None else now.year
+        self.start, self.end = get_month_range(self.month, self.year)
+    
+    def _fetch_amounts(self, expenses, amounts_by_category):
+        rows = expenses.filter(
+            user=self.user,
+            date__gte=self.start,
+            date__lt=self.end
+        ).order_by().values_list('category', 'amount_cents')
+        for category, cents in rows.iterator():
+            if category not in amounts_by_category:
+                amounts_by_category[category] = array('q')
+            amounts_by_category[category].append(cents)
+    
+    @cached_property
+    def _summary(self):
+        watermark = ArchiveWatermark.objects.filter(user=self.user).order_by()
+        report = Report.objects.filter(
+            user=self.user,
+            month=self.month,
+            year=self.year
+        ).values('id', 'total_cents', 'category_stats', 'stats_version', 'created_at').annotate(
+            archived_before=Subquery(watermark.values('archived_before')[:1])
+        ).first()
+        
+        if report is not None:
+            archived_before = report.pop('archived_before')
+            if report['category_stats'] is not None:
+                return {'report': report, 'categories': report['category_stats'], 'fresh': True}
+        else:
+            archived_before = watermark.values_list('archived_before', flat=True).first()
+        
+        amounts_by_category = {}
+        self._fetch_amounts(Expense.objects.all(), amounts_by_category)
+        if archived_before is not None and self.start < archived_before:
+            self._fetch_amounts(ArchivedExpense.objects.all(), amounts_by_category)
+        
+        return {
+            'report': report,
+            'categories': compute_category_stats(amounts_by_category),
+            'fresh': False,
+        }
+    
+    @property
+    def category_summary(self):
+        return self._summary['categories']
+    
+    @property
+    def total_cents(self):
+        return sum(entry['total_cents'] for entry in self.category_summary)
+    
+    def save(self):
+        """Store the month's total and category stats, skipping the write when they are up to date"""
+        stored = self._summary['report']
+        if stored is None:
+            # Expense writes only mark existing rows stale, so one made while the amounts were
+            # read would go unnoticed. Create the row without stats, then read the month again
+            # under its stats_version.
+            try:
+                with transaction.atomic():
+                    Report.objects.create(
+                        user=self.user,
+                        month=self.month,
+                        year=self.year,
+                        total_cents=self.total_cents,
+                        category_stats=None
+                    )
+            except IntegrityError:
+                # Created concurrently by another request
+                pass
+            del self._summary
+            stored = self._summary['report']
+        
+        total_cents = self.total_cents
+        category_stats = self.category_summary
+        if not self._summary['fresh']:
+            # An expense write since the stats were read bumps stats_version, so stale stats are never stored
+            Report.objects.filter(pk=stored['id'], stats_version=stored['stats_version']).update(
+                total_cents=total_cents,
+                category_stats=category_stats
+            )
+        return Report(
+            id=stored['id'],
+            user=self.user,
+            month=self.month,
+            year=self.year,
+            total_cents=total_cents,
+            category_stats=category_stats,
+            stats_version=stored['stats_version'],
+            created_at=stored['created_at']
+        )
+
+
+def generate_monthly_report(user, month=None, year=None):
+    """Generate or update monthly report for a user"""
+    return MonthlyReport(user, month, year).save()
+
+
+def get_user_reports(user, year=None):
+    """Get all reports for a user, optionally filtered by year"""
+    queryset = Report.objects.filter(user=user)
+    if year:
+        queryset = queryset.filter(year=year)
+    return queryset.order_by('-year', '-month')
+
+
+def get_category_summary(user, month=None, year=None):
+    """Get expense summary by category for a specific month"""
+    return MonthlyReport(user, month, year).category_summary
+
+
+def format_category_summary(category_summary):
+    """Render category totals in cents, and any distribution stats, as JSON numbers"""
+    formatted = []
+    for entry in category_summary:
+        item = {'category': entry['category'], 'total': cents_to_number(entry['total_cents']), 'count': entry['count']}
+        if 'median_cents' in entry:
+            item['median'] = cents_to_number(entry['median_cents'])
+            item['p90'] = cents_to_number(entry['p90_cents'])
+            item['largest'] = cents_to_number(entry['max_cents'])
+        formatted.append(item)
+    return formatted
+
+
+def get_daily_totals(expenses):
+    """Sum an expense queryset per date in one grouped query, in cents"""
+    rows = expenses.order_by().values('date').annotate(total_cents=Sum('amount_cents'))
+    return {row['date']: row['total_cents'] for row in rows}
+
+
+def adjust_daily_totals(user, deltas):
+    """Shift a user's per-day spending totals by per-date deltas in cents.
+    
+    Each delta is added by one INSERT ... ON CONFLICT DO UPDATE, so a day that
+    two transactions create at the same time ends up with both deltas instead
+    of failing on the unique (user, date) constraint. Dates are written in
+    order so concurrent writers lock the rows in the same order.
+    """
+    deltas = {day: delta for day, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    
+    ops = connection.ops
+    table = ops.quote_name(DailyTotal._meta.db_table)
+    columns = ', '.join(ops.quote_name(column) for column in ['user_id', 'date', 'total_cents'])
+    total = ops.quote_name('total_cents')
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {table} ({columns}) VALUES (%s, %s, %s) '
+            f'ON CONFLICT ({ops.quote_name("user_id")}, {ops.quote_name("date")}) '
+            f'DO UPDATE SET {total} = {table}.{total} + excluded.{total}',
+            [(user.pk, ops.adapt_datefield_value(day), delta) for day, delta in sorted(deltas.items())]
+        )
+
+
+def get_spending_calendar(user, year):
+    """Return a user's spending per day of a year as a list of integer cents"""
+    start = date(year, 1, 1)
+    days = [0] * (date(year + 1, 1, 1) - start).days
+    totals = DailyTotal.objects.filter(
+        user=user,
+        date__gte=start,
+        date__lt=date(year + 1, 1, 1)
+    ).values_list('date', 'total_cents')
+    for day, cents in totals:
+        days[(day - start).days] = cents
+    return days
+
+
+def invalidate_category_stats(user, months):
+    """Mark the stored category stats of the given (year, month) pairs as stale"""
+    months = set(months)
+    if not months:
+        return 0
+    
+    condition = Q()
+    for year, month in months:
+        condition |= Q(year=year, month=month)
+    return Report.objects.filter(condition, user=user).update(
+        category_stats=None,
+        stats_version=F('stats_version') + 1
+    )
@@ -1,53 +1,75 @@
-from rest_framework import generics, permissions
-from rest_framework.response import Response
-from django.utils import timezone
-from .models import Report
-from .utils import generate_monthly_report, get_user_reports, get_category_summary
-
-
-class ReportListView(generics.ListAPIView):
-    permission_classes = [permissions.IsAuthenticated]
-    
-    def get_queryset(self):
-        year = self.request.query_params.get('year')
-        return get_user_reports(self.request.user, year)
-    
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        data = []
-        for report in queryset:
-            data.append({
-                'id': report.id,
-                'month': report.month,
-                'year': report.year,
-                'total_amount': report.total_amount,
-                'created_at': report.created_at
-            })
-        return Response(data)
-
-
-class ReportDetailView(generics.RetrieveAPIView):
-    permission_classes = [permissions.IsAuthenticated]
-    
-    def get_queryset(self):
-        return Report.objects.filter(user=self.request.user)
-    
-    def retrieve(self, request, *args, **kwargs):
-        month = self.request.query_params.get('month', timezone.now().month)
-        year = self.request.query_params.get('year', timezone.now().year)
-        
-        # Generate or get the report
-        report = generate_monthly_report(request.user, int(month), int(year))
-        
-        # Get category summary
-        category_summary = get_category_summary(request.user, int(month), int(year))
-        
-        data = {
-            'month': report.month,
-            'year': report.year,
-            'total_amount': report.total_amount,
-            'category_summary': list(category_summary),
-            'created_at': report.created_at
-        }
-        
-        return Response(data)
+from rest_framework import generics, permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.utils import timezone
+from expense_tracker.routers import ReplicaReadMixin
+from expenses.money import cents_to_number
+from .models import Report
+from .serializers import ReportQuerySerializer
+from .utils import MonthlyReport, format_category_summary, get_user_reports, get_spending_calendar
+
+
+class ReportListView(ReplicaReadMixin, generics.ListAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        year = self.request.query_params.get('year')
+        return get_user_reports(self.request.user, year)
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        data = []
+        for report in queryset:
+            data.append({
+                'id': report.id,
+                'month': report.month,
+                'year': report.year,
+                'total_amount': cents_to_number(report.total_cents),
+                'created_at': report.created_at
+            })
+        return Response(data)
+
+
+class ReportDetailView(generics.RetrieveAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        return Report.objects.filter(user=self.request.user)
+    
+    def retrieve(self, request, *args, **kwargs):
+        # Validate the month once; the total and the breakdown share one grouped query
+        query = ReportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        monthly_report = MonthlyReport(request.user, **query.validated_data)
+        
+        # Generate or get the report
+        report = monthly_report.save()
+        
+        data = {
+            'month': report.month,
+            'year': report.year,
+            'total_amount': cents_to_number(report.total_cents),
+            'category_summary': format_category_summary(monthly_report.category_summary),
+            'created_at': report.created_at
+        }
+        
+        return Response(data)
+
+
+class SpendingCalendarView(ReplicaReadMixin, APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, *args, **kwargs):
+        year = request.query_params.get('year', timezone.now().year)
+        try:
+            year = int(year)
+        except (TypeError, ValueError):
+            raise ValidationError({'year': 'A valid year is required.'})
+        if not 1 <= year <= 9998:
+            raise ValidationError({'year': 'A valid year is required.'})
+        
+        return Response({
+            'year': year,
+            'days': get_spending_calendar(request.user, year),
+        })
@@ -1,3 +1,3 @@
-
-
-
+
+
+
@@ -1,13 +1,13 @@
-from django.contrib import admin
-from django.contrib.auth.admin import UserAdmin
-from django.contrib.auth import get_user_model
-
-User = get_user_model()
-
-
-@admin.register(User)
-class CustomUserAdmin(UserAdmin):
-    list_display = ['username', 'email', 'is_active', 'created_at']
-    list_filter = ['is_active', 'created_at']
-    search_fields = ['username', 'email']
-    ordering = ['-created_at']
+from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+@admin.register(User)
+class CustomUserAdmin(UserAdmin):
+    list_display = ['username', 'email', 'is_active', 'created_at']
+    list_filter = ['is_active', 'created_at']
+    search_fields = ['username', 'email']
+    ordering = ['-created_at']
@@ -0,0 +1,31 @@
+from django.core import signing
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from .tokens import read_access_token
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """Authenticate `Authorization: Bearer <token>` requests with a signed access token"""
+    keyword = 'Bearer'
+    
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+        
+        try:
+            token = auth[1].decode()
+            user = read_access_token(token)
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed('Token has expired.')
+        except (signing.BadSignature, UnicodeError, KeyError, TypeError):
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        if user is None:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        
+        return (user, token)
+    
+    def authenticate_header(self, request):
+        return self.keyword
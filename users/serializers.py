@@ -1,23 +1,55 @@
-from rest_framework import serializers
-from django.contrib.auth import get_user_model
-
-User = get_user_model()
-
-
-class UserSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = User
-        fields = ['id', 'username', 'email', 'created_at']
-        read_only_fields = ['id', 'created_at']
-
-
-class UserRegistrationSerializer(serializers.ModelSerializer):
-    password = serializers.CharField(write_only=True)
-    
-    class Meta:
-        model = User
-        fields = ['username', 'email', 'password']
-    
-    def create(self, validated_data):
-        user = User.objects.create_user(**validated_data)
-        return user
+from rest_framework import serializers
+from django.contrib.auth import authenticate, get_user_model
+from django.core import signing
+from .tokens import read_refresh_token
+
+User = get_user_model()
+
+
+class UserSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'email', 'created_at']
+        read_only_fields = ['id', 'created_at']
+
+
+class UserRegistrationSerializer(serializers.ModelSerializer):
+    password = serializers.CharField(write_only=True)
+    
+    class Meta:
+        model = User
+        fields = ['username', 'email', 'password']
+    
+    def create(self, validated_data):
+        user = User.objects.create_user(**validated_data)
+        return user
+
+
+class TokenObtainSerializer(serializers.Serializer):
+    username = serializers.CharField()
+    password = serializers.CharField(write_only=True)
+    
+    def validate(self, attrs):
+        user = authenticate(
+            request=self.context.get('request'),
+            username=attrs['username'],
+            password=attrs['password']
+        )
+        if user is None:
+            raise serializers.ValidationError('Invalid username or password.')
+        attrs['user'] = user
+        return attrs
+
+
+class TokenRefreshSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+    
+    def validate(self, attrs):
+        try:
+            user = read_refresh_token(attrs['refresh'])
+        except signing.BadSignature:
+            user = None
+        if user is None:
+            raise serializers.ValidationError('Invalid or expired refresh token.')
+        attrs['user'] = user
+        return attrs
@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+
+class TokenTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'testpass123')
+        self.client = APIClient()
+    
+    def obtain(self, password='testpass123'):
+        return self.client.post('/api/users/token/', {'username': 'alice', 'password': password}, format='json')
+    
+    def test_access_token(self):
+        self.assertEqual(self.obtain('wrong').status_code, 400)
+        tokens = self.obtain().data
+        
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        profile = self.client.get('/api/users/profile/').data
+        self.assertEqual((profile['username'], profile['email']), ('alice', 'alice@example.com'))
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        self.assertEqual(self.client.get('/api/expenses/').status_code, 401)
+    
+    def test_inactive_users_are_rejected(self):
+        tokens = self.obtain().data
+        self.user.is_active = False
+        self.user.save()
+        
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(self.client.get('/api/expenses/').status_code, 401)
+    
+    def test_refresh(self):
+        tokens = self.obtain().data
+        response = self.client.post('/api/users/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.data)
+        
+        # Changing the password revokes outstanding refresh tokens
+        self.user.set_password('newpass456')
+        self.user.save()
+        response = self.client.post('/api/users/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,53 @@
+"""
+Signed, short-lived API tokens.
+
+Access tokens carry the user's id and are verified with an HMAC signature;
+the user is then loaded with a single primary-key lookup so that deactivated
+accounts are rejected immediately. Refresh tokens live longer and are also
+checked against the user's password when they are used.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+
+User = get_user_model()
+
+ACCESS_TOKEN_SALT = 'users.tokens.access'
+REFRESH_TOKEN_SALT = 'users.tokens.refresh'
+
+
+def _password_fingerprint(user):
+    # Changing the password invalidates outstanding refresh tokens
+    return user.get_session_auth_hash()[:16]
+
+
+def issue_tokens(user):
+    """Create an access/refresh token pair for a user"""
+    access = signing.dumps({'uid': user.pk}, salt=ACCESS_TOKEN_SALT)
+    refresh = signing.dumps(
+        {'uid': user.pk, 'pwd': _password_fingerprint(user)},
+        salt=REFRESH_TOKEN_SALT
+    )
+    return {
+        'access': access,
+        'refresh': refresh,
+        'expires_in': settings.ACCESS_TOKEN_LIFETIME,
+    }
+
+
+def read_access_token(token):
+    """Verify an access token and return the active user it belongs to, or None.
+    
+    Raises signing.BadSignature (or SignatureExpired) for invalid tokens.
+    """
+    payload = signing.loads(token, salt=ACCESS_TOKEN_SALT, max_age=settings.ACCESS_TOKEN_LIFETIME)
+    return User.objects.filter(pk=payload['uid'], is_active=True).first()
+
+
+def read_refresh_token(token):
+    """Verify a refresh token and return the active user it belongs to, or None"""
+    payload = signing.loads(token, salt=REFRESH_TOKEN_SALT, max_age=settings.REFRESH_TOKEN_LIFETIME)
+    user = User.objects.filter(pk=payload['uid'], is_active=True).first()
+    if user is None or _password_fingerprint(user) != payload['pwd']:
+        return None
+    return user
@@ -1,7 +1,9 @@
-from django.urls import path
-from .views import UserRegistrationView, UserProfileView
-
-urlpatterns = [
-    path('register/', UserRegistrationView.as_view(), name='user-register'),
-    path('profile/', UserProfileView.as_view(), name='user-profile'),
-]
+from django.urls import path
+from .views import UserRegistrationView, UserProfileView, TokenObtainView, TokenRefreshView
+
+urlpatterns = [
+    path('register/', UserRegistrationView.as_view(), name='user-register'),
+    path('profile/', UserProfileView.as_view(), name='user-profile'),
+    path('token/', TokenObtainView.as_view(), name='token-obtain'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+]
@@ -1,20 +1,38 @@
-from rest_framework import generics, permissions
-from rest_framework.response import Response
-from django.contrib.auth import get_user_model
-from .serializers import UserSerializer, UserRegistrationSerializer
-
-User = get_user_model()
-
-
-class UserRegistrationView(generics.CreateAPIView):
-    queryset = User.objects.all()
-    serializer_class = UserRegistrationSerializer
-    permission_classes = [permissions.AllowAny]
-
-
-class UserProfileView(generics.RetrieveUpdateAPIView):
-    serializer_class = UserSerializer
-    permission_classes = [permissions.IsAuthenticated]
-    
-    def get_object(self):
-        return self.request.user
+from rest_framework import generics, permissions
+from rest_framework.response import Response
+from django.contrib.auth import get_user_model
+from .serializers import (
+    UserSerializer, UserRegistrationSerializer, TokenObtainSerializer, TokenRefreshSerializer
+)
+from .tokens import issue_tokens
+
+User = get_user_model()
+
+
+class UserRegistrationView(generics.CreateAPIView):
+    queryset = User.objects.all()
+    serializer_class = UserRegistrationSerializer
+    permission_classes = [permissions.AllowAny]
+
+
+class UserProfileView(generics.RetrieveUpdateAPIView):
+    serializer_class = UserSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_object(self):
+        return self.request.user
+
+
+class TokenObtainView(generics.GenericAPIView):
+    serializer_class = TokenObtainSerializer
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(issue_tokens(serializer.validated_data['user']))
+
+
+class TokenRefreshView(TokenObtainView):
+    serializer_class = TokenRefreshSerializer
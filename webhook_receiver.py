@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Stub webhook receiver for trying out expense event delivery locally.
+
+Listens for POSTed event batches, checks the X-Expense-Signature header when
+a secret is given, and prints each event. Use --fail-rate to answer some
+requests with 503, to watch the dispatcher retry and back off. The server
+only delivers to loopback addresses with WEBHOOK_ALLOW_PRIVATE_ADDRESSES on:
+
+    python webhook_receiver.py --port 8001 --secret <endpoint secret>
+    python manage.py dispatch_events --loop
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SIGNATURE_TOLERANCE = 5 * 60
+
+
+def verify_signature(secret, header, body):
+    """Check a 't=<unix time>,v1=<hex digest>' signature of the raw request body"""
+    parts = dict(item.split('=', 1) for item in header.split(',') if '=' in item)
+    try:
+        timestamp = int(parts['t'])
+    except (KeyError, ValueError):
+        return False
+    if abs(time.time() - timestamp) > SIGNATURE_TOLERANCE:
+        return False
+    expected = hmac.new(secret.encode(), f'{timestamp}.'.encode() + body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, parts.get('v1', ''))
+
+
+def make_handler(secret, fail_rate):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if secret and not verify_signature(secret, self.headers.get('X-Expense-Signature', ''), body):
+                print('✗ Rejected a batch with a bad signature')
+                return self.reply(401)
+            if random.random() < fail_rate:
+                print('⚠ Simulating a failure')
+                return self.reply(503)
+            
+            events = json.loads(body)['events']
+            print(f'✓ Received {len(events)} events')
+            for event in events:
+                expense = event['expense'] or {}
+                print(f"  #{event['id']} expense {event['expense_id']} {event['action']} {expense.get('amount', '')}")
+            self.reply(204)
+        
+        def reply(self, status):
+            self.send_response(status)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--secret', help='Endpoint secret used to verify signatures')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of requests to answer with 503')
+    args = parser.parse_args()
+    
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.secret, args.fail_rate))
+    print(f'Listening on http://{args.host}:{args.port}/')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()